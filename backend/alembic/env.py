@@ -17,7 +17,8 @@ sys.path.append(backend_path)
 
 
 # Import ALL models so Alembic can detect them for autogeneration
-from models import user, group, group_member, expenses, expense_share
+from models import user, group, group_member, expenses, expense_share, group_balance, settlement, monthly_spend, archive
+from db.session import to_sync_url
 
 # This is the Alembic Config object, which provides
 # access to values within the .ini file in use.
@@ -47,7 +48,7 @@ def run_migrations_offline() -> None:
     directly to the output.
     """
     # Retrieve the database URL from application settings
-    url = settings.DATABASE_URL
+    url = to_sync_url(settings.DATABASE_URL)
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -69,7 +70,7 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section)
     if configuration is None:
         configuration = {}
-    configuration["sqlalchemy.url"] = settings.DATABASE_URL
+    configuration["sqlalchemy.url"] = to_sync_url(settings.DATABASE_URL)
 
     connectable = engine_from_config(
         configuration,
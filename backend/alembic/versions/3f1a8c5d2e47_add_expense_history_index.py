@@ -0,0 +1,28 @@
+"""add expense history index
+
+Revision ID: 3f1a8c5d2e47
+Revises: b7e2d41c9a10
+Create Date: 2026-02-03 09:41:07.518326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a8c5d2e47'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d41c9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_expense_group_id_date_id', 'expense', ['group_id', 'date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expense_group_id_date_id', table_name='expense')
@@ -0,0 +1,34 @@
+"""add foreign key indexes
+
+Revision ID: 9d3c6b2f8e15
+Revises: 3f1a8c5d2e47
+Create Date: 2026-02-05 14:22:48.913052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c6b2f8e15'
+down_revision: Union[str, Sequence[str], None] = '3f1a8c5d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # expense.group_id is already served by ix_expense_group_id_date_id (leading column)
+    # and expenseshare.expense_id by the (expense_id, user_id) unique constraint.
+    op.create_index(op.f('ix_expense_payer_id'), 'expense', ['payer_id'], unique=False)
+    op.create_index(op.f('ix_expenseshare_user_id'), 'expenseshare', ['user_id'], unique=False)
+    op.create_index(op.f('ix_groupmember_user_id'), 'groupmember', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_groupmember_user_id'), table_name='groupmember')
+    op.drop_index(op.f('ix_expenseshare_user_id'), table_name='expenseshare')
+    op.drop_index(op.f('ix_expense_payer_id'), table_name='expense')
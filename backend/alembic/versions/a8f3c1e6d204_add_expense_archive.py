@@ -0,0 +1,53 @@
+"""add expense archive tables
+
+Revision ID: a8f3c1e6d204
+Revises: e41b6f0d8a37
+Create Date: 2026-03-12 15:48:02.631907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8f3c1e6d204'
+down_revision: Union[str, Sequence[str], None] = 'e41b6f0d8a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archivedexpense',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('payer_id', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['group.id'], ),
+    sa.ForeignKeyConstraint(['payer_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archivedexpense_group_id_date_id', 'archivedexpense', ['group_id', 'date', 'id'], unique=False)
+    op.create_table('archivedexpenseshare',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('expense_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('is_paid', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['expense_id'], ['archivedexpense.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('expense_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('archivedexpenseshare')
+    op.drop_index('ix_archivedexpense_group_id_date_id', table_name='archivedexpense')
+    op.drop_table('archivedexpense')
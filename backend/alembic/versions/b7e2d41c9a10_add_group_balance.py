@@ -0,0 +1,36 @@
+"""add group balance ledger
+
+Revision ID: b7e2d41c9a10
+Revises: 4ca9efd0f2a3
+Create Date: 2026-01-20 10:12:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d41c9a10'
+down_revision: Union[str, Sequence[str], None] = '4ca9efd0f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('groupbalance',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('net_cents', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['group.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'user_id')
+    )
+    # Existing groups are backfilled with: python -m scripts.reconcile_balances
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('groupbalance')
@@ -0,0 +1,31 @@
+"""add group version
+
+Revision ID: c2d7e9a4b611
+Revises: 5e8a1f4c7b92
+Create Date: 2026-02-26 16:05:19.774203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d7e9a4b611'
+down_revision: Union[str, Sequence[str], None] = '5e8a1f4c7b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'group',
+        sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('0')),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('group', 'version')
@@ -0,0 +1,38 @@
+"""add group monthly spend rollup
+
+Revision ID: e41b6f0d8a37
+Revises: c2d7e9a4b611
+Create Date: 2026-03-04 11:26:53.190448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b6f0d8a37'
+down_revision: Union[str, Sequence[str], None] = 'c2d7e9a4b611'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('groupmonthlyspend',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('paid_cents', sa.BigInteger(), nullable=False),
+    sa.Column('owed_cents', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['group.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'month', 'user_id')
+    )
+    # Existing history is backfilled with: python -m scripts.rebuild_rollups
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('groupmonthlyspend')
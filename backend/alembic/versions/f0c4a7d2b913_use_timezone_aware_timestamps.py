@@ -0,0 +1,62 @@
+"""use timezone-aware timestamps
+
+The models store aware UTC datetimes (sqlmodel's UTCDateTime), which
+asyncpg refuses to bind to `timestamp without time zone` columns. Existing
+values were written in UTC.
+
+Revision ID: f0c4a7d2b913
+Revises: a8f3c1e6d204
+Create Date: 2026-10-18 10:12:40.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0c4a7d2b913'
+down_revision: Union[str, Sequence[str], None] = 'a8f3c1e6d204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ('group', 'created_at'),
+    ('groupmember', 'joined_at'),
+    ('expense', 'date'),
+    ('settlement', 'created_at'),
+    ('archivedexpense', 'date'),
+    ('archivedexpense', 'archived_at'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite has no time zone types: nothing to change
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(),
+            existing_type=sa.DateTime(timezone=True),
+            existing_nullable=False,
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
@@ -1,29 +1,38 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Optional
 
 from core.config import settings
-from db.session import get_db
+from db.session import get_db, replica_router
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from models.user import User
 from pydantic import ValidationError
 from schemas.token import TokenPayload
-from sqlmodel import Session
+from schemas.user import UserPublic
+from services.user_cache import cache_user, get_cached_user
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Declare the token URL so Swagger UI knows where to obtain the token
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
 
-SessionDep = Annotated[Session, Depends(get_db)]
+# Same scheme without the automatic 401, for routes that also take the token
+# from the query string
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
+)
+
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+async def get_current_user(session: SessionDep, token: TokenDep) -> UserPublic:
     """
     This function runs before each protected request.
-    It decodes the token -> extracts user_id -> queries the database
-    -> returns the User object.
+    It decodes the token -> extracts user_id -> looks the user up in the
+    in-process user cache, falling back to the database on a miss
+    -> returns a slim, read-only user record.
     """
     try:
         payload = jwt.decode(
@@ -44,16 +53,65 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    
-    user = session.get(User, user_id)
+
+    user = get_cached_user(user_id)
+    if user is None:
+        db_user = await session.get(User, user_id)
+        if db_user:
+            user = cache_user(db_user)
+
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    # Commits of this session are the user's writes (read-your-writes routing)
+    session.info["user_id"] = user.id
     return user
 
 
 # Type alias for the current authenticated user
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
+
+
+async def get_read_db(
+    session: SessionDep, current_user: CurrentUser
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only routes: a replica when DATABASE_REPLICA_URLS is set,
+    unless the user wrote recently, else the primary session of the request.
+    Never use it to write.
+    """
+    replica = replica_router.replica_for(current_user.id)
+    if replica is None:
+        yield session
+        return
+    async with replica() as replica_session:
+        yield replica_session
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
+
+
+
+async def get_stream_user(
+    session: SessionDep,
+    header_token: Annotated[Optional[str], Depends(optional_oauth2)],
+    token: Optional[str] = None,
+) -> UserPublic:
+    """
+    Like get_current_user, but also accepts the JWT as `?token=`: browsers'
+    EventSource cannot send an Authorization header.
+    """
+    token = header_token or token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(session, token)
+
 
+# Current user of a streaming endpoint (header or query string token)
+StreamUser = Annotated[UserPublic, Depends(get_stream_user)]
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from api.deps import CurrentUser, ReadSessionDep
+from api.routes.groups import require_membership
+from core.responses import ORJSONResponse
+from fastapi import APIRouter, Query
+from schemas.analytics import GroupSpendHistory, TopPayers
+from services.rollups import month_of, read_monthly_spend, read_top_payers
+from services.settlement import from_cents
+
+router = APIRouter()
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get(
+    "/{group_id}/analytics/monthly",
+    response_model=GroupSpendHistory,
+    response_class=ORJSONResponse,
+)
+async def read_group_monthly_spend(
+    group_id: int,
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    start: Optional[str] = Query(default=None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(default=None, pattern=MONTH_PATTERN),
+):
+    """
+    Spending of a group per month (YYYY-MM, inclusive range) and per member:
+    what each member paid for and what their own shares cost. Served from the
+    monthly rollup, whatever the size of the group's history.
+    """
+    await require_membership(session, group_id, current_user.id)
+
+    rows = await session.run_sync(read_monthly_spend, group_id, start, end)
+    months = []
+    for month, user_id, paid_cents, owed_cents in rows:
+        if not months or months[-1]["month"] != month:
+            months.append({"month": month, "total": 0, "members": []})
+        months[-1]["total"] += paid_cents
+        months[-1]["members"].append(
+            {"user_id": user_id, "paid": from_cents(paid_cents), "owed": from_cents(owed_cents)}
+        )
+    for month in months:
+        month["total"] = from_cents(month["total"])
+
+    return ORJSONResponse({"group_id": group_id, "months": months})
+
+
+@router.get(
+    "/{group_id}/analytics/top-payers",
+    response_model=TopPayers,
+    response_class=ORJSONResponse,
+)
+async def read_group_top_payers(
+    group_id: int,
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    month: Optional[str] = Query(default=None, pattern=MONTH_PATTERN),
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """
+    Members who paid the most in a month (YYYY-MM, default: the current UTC
+    month), biggest payer first.
+    """
+    await require_membership(session, group_id, current_user.id)
+
+    month = month or month_of(datetime.now(timezone.utc))
+    rows = await session.run_sync(read_top_payers, group_id, month, limit)
+    return ORJSONResponse(
+        {
+            "group_id": group_id,
+            "month": month,
+            "payers": [
+                {"user_id": user_id, "paid": from_cents(paid_cents), "owed": from_cents(owed_cents)}
+                for user_id, paid_cents, owed_cents in rows
+            ],
+        }
+    )
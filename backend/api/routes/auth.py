@@ -15,7 +15,7 @@ router = APIRouter()
 
 
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
+async def login_access_token(
     session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
     """
@@ -24,17 +24,26 @@ def login_access_token(
     # 1. Find user by email (OAuth2 uses "username" field by default,
     # here we allow login using email)
     statement = select(User).where(User.email == form_data.username)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
 
-    # 2. Verify password
-    if not user or not security.verify_password(
+    # 2. Verify password (bcrypt runs in the dedicated process pool)
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    verified, new_hash = await security.password_hasher.verify_and_update(
         form_data.password, user.hashed_password
-    ):
+    )
+    if not verified:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
+    # The hash was made with an older bcrypt cost: transparently upgrade it
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+
     # 3. Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
@@ -44,12 +53,14 @@ def login_access_token(
 
 
 @router.post("/signup", response_model=UserPublic)
-def register_user(session: SessionDep, user_in: UserCreate) -> Any:
+async def register_user(session: SessionDep, user_in: UserCreate) -> Any:
     """
     Create a new user without requiring authentication.
     """
     # Check for duplicate email
-    user_by_email = session.exec(select(User).where(User.email == user_in.email)).first()
+    user_by_email = (
+        await session.exec(select(User).where(User.email == user_in.email))
+    ).first()
     if user_by_email:
         raise HTTPException(
             status_code=400,
@@ -57,7 +68,9 @@ def register_user(session: SessionDep, user_in: UserCreate) -> Any:
         )
     
     # Check for duplicate username
-    user_by_username = session.exec(select(User).where(User.username == user_in.username)).first()
+    user_by_username = (
+        await session.exec(select(User).where(User.username == user_in.username))
+    ).first()
     if user_by_username:
         raise HTTPException(
             status_code=400,
@@ -65,16 +78,17 @@ def register_user(session: SessionDep, user_in: UserCreate) -> Any:
         )
 
     # Create a new user
+    hashed_password = await security.password_hasher.hash(user_in.password)
     try:
         user = User.model_validate(
             user_in,
-            update={"hashed_password": security.get_password_hash(user_in.password)},
+            update={"hashed_password": hashed_password},
         )
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await session.commit()
+        await session.refresh(user)
     except Exception:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=500,
             detail="An error occurred while creating the user",
@@ -83,7 +97,7 @@ def register_user(session: SessionDep, user_in: UserCreate) -> Any:
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
+async def read_user_me(current_user: CurrentUser) -> Any:
     """
     Retrieve the current authenticated user.
     """
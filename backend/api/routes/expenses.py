@@ -1,73 +1,86 @@
-from decimal import Decimal
+from typing import Annotated, Optional
+
 from api.deps import CurrentUser, SessionDep
-from fastapi import APIRouter, HTTPException
-from models.expense_share import ExpenseShare
-from models.expenses import Expense
-from models.group_member import GroupMember
+from core.responses import ORJSONResponse
+from fastapi import APIRouter, Header, HTTPException, Response
 from schemas.expense import ExpenseCreate, ExpenseRead
-from sqlmodel import select
+from schemas.user import UserPublic
+from services.expenses import insert_expense
+from services.group_events import EXPENSE_CREATED, publish_group_event
+from services.idempotency import idempotency_store, request_fingerprint
+from services.membership import advance_group_members, get_current_group_members
+from services.settlement_plans import schedule_settlement_plan
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter()
 
 
-@router.post("/", response_model=ExpenseRead)
-def create_expense(
+@router.post("/", response_model=ExpenseRead, response_class=ORJSONResponse)
+async def create_expense(
     expense_in: ExpenseCreate,
     session: SessionDep,
     current_user: CurrentUser,
+    idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
 ):
     """
     Create a new expense in a group.
     The current user is set as the payer of the expense.
-    """
-    # Verify that the current user is a member of the group
-    membership_statement = select(GroupMember).where(
-        GroupMember.group_id == expense_in.group_id,
-        GroupMember.user_id == current_user.id,
-    )
-    membership = session.exec(membership_statement).first()
-    if not membership:
-        raise HTTPException(
-            status_code=403, detail="You are not a member of this group."
-        )
 
-    # Create the expense
-    expense = Expense(
-        amount=expense_in.amount,
-        description=expense_in.description,
-        group_id=expense_in.group_id,
-        payer_id=current_user.id,
-    )
-    session.add(expense)
-    session.flush()
+    Send an `Idempotency-Key` header to make retries safe: a request repeating
+    a key gets the first response back (with `Idempotent-Replayed: true`)
+    instead of creating another expense.
+    """
+    if idempotency_key is None:
+        return await _create_expense(session, current_user, expense_in)
 
-    # Retrieve all group members to split the expense
-    members = session.exec(
-        select(GroupMember).where(GroupMember.group_id == expense_in.group_id)
-    ).all()
+    fingerprint = request_fingerprint(expense_in.model_dump_json())
+    async with idempotency_store.claim(current_user.id, idempotency_key) as slot:
+        stored = slot.response
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            return Response(
+                content=stored.body,
+                status_code=stored.status_code,
+                media_type="application/json",
+                headers={"Idempotent-Replayed": "true"},
+            )
 
-    if not members:
-        raise HTTPException(status_code=400, detail="Group has no members")
+        # Errors raise before anything is stored, so they can be retried
+        response = await _create_expense(session, current_user, expense_in)
+        slot.save(fingerprint, response.status_code, response.body)
+        return response
 
-    total_members = len(members)
-    split_amount = round(Decimal(expense.amount) / Decimal(total_members), 2)
 
-    shares = []
-    for member in members:
-        is_paid = member.user_id == current_user.id
-        share = ExpenseShare(
-            expense_id=expense.id,
-            user_id=member.user_id,
-            amount=split_amount,
-            is_paid=is_paid,
+async def _create_expense(
+    session: AsyncSession, current_user: UserPublic, expense_in: ExpenseCreate
+) -> ORJSONResponse:
+    # One (usually cached) lookup, checked against the group's version, gives
+    # both the membership check and the list of members to split between
+    members = await get_current_group_members(session, expense_in.group_id)
+    if not members.is_member(current_user.id):
+        raise HTTPException(
+            status_code=403, detail="You are not a member of this group."
         )
-        shares.append(share)
-        session.add(share)
-
-    session.commit()
 
-    # Refresh expense to include shares
-    session.refresh(expense)
-    
-    return ExpenseRead(**expense.model_dump(), shares=shares)
+    # Insert the expense, its shares and the ledger deltas in one transaction;
+    # the response is built from the inserted values, no reload or validation
+    expense = await session.run_sync(
+        insert_expense,
+        expense_in.group_id,
+        current_user.id,
+        expense_in.amount,
+        expense_in.description,
+        members.member_ids,
+    )
+    await session.commit()
+    # The insert bumped the version: the next expense can still use the entry
+    advance_group_members(expense_in.group_id, members)
+    await publish_group_event(expense_in.group_id, EXPENSE_CREATED, expense)
+    # Off the request path: the plan is ready by the time members look at it
+    schedule_settlement_plan(expense_in.group_id)
 
+    return ORJSONResponse(expense)
@@ -1,21 +1,88 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional, Tuple
 
-from api.deps import CurrentUser, SessionDep
+from api.deps import CurrentUser, ReadSessionDep, SessionDep, StreamUser
 from core.config import settings
+from core.etag import etag_headers, etag_matches, not_modified, weak_etag
+from core.responses import ORJSONResponse
 from core.security import create_access_token
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from jose import JWTError, jwt
 from models.group import Group
 from models.group_member import GroupMember
-from schemas.group import GroupCreate, GroupInviteResponse, GroupRead, JoinGroupRequest
+from schemas.expense import ExpenseImportResult, ExpensePage
+from schemas.group import (
+    GroupCreate,
+    GroupDetail,
+    GroupInviteResponse,
+    GroupRead,
+    JoinGroupRequest,
+)
+from schemas.settlement import GroupSettlements, SettlementRead, SettleRequest
+from services.expenses import InvalidCursor, list_group_expenses
+from services.export import EXPORT_MEDIA_TYPES, stream_group_ledger
+from services.group_events import (
+    EXPENSES_IMPORTED,
+    MEMBER_JOINED,
+    SETTLEMENT_CREATED,
+    publish_group_event,
+    stream_group_events,
+)
+from services.group_version import bump_group_version, read_group_version
+from services.importer import InvalidImportFile, import_expenses
+from services.membership import GroupMembers, get_current_group_members, get_group_members
+from services.settle_up import NothingToSettle, settle_shares
+from services.settlement import from_cents
+from services.settlement_plans import get_settlement_plan, schedule_settlement_plan
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter()
 
 
+async def require_membership(
+    session: AsyncSession, group_id: int, user_id: int, current: bool = False
+) -> GroupMembers:
+    """
+    Ensure the group exists (404) and that the user belongs to it (403).
+    Returns the group's members, served from the membership cache; pass
+    `current` when splitting between them (see get_current_group_members).
+    """
+    if current:
+        members = await get_current_group_members(session, group_id)
+    else:
+        members = await get_group_members(session, group_id)
+    if members.is_member(user_id):
+        return members
+
+    # Every group has at least its creator, so only look the group up when
+    # the member list is empty
+    if not members.member_ids and not await session.get(Group, group_id):
+        raise HTTPException(status_code=404, detail="Group not found")
+    raise HTTPException(status_code=403, detail="You are not a member of this group.")
+
+
+async def read_version_or_404(
+    session: AsyncSession, primary: AsyncSession, group_id: int
+) -> Tuple[AsyncSession, int]:
+    """
+    The group's version, read from `session` (possibly a replica), and the
+    session the rest of the request should read from. A replica lagging
+    behind the cached membership check may not have the group yet: the
+    primary is asked instead, and 404 raised only if it has none either.
+    """
+    version = await read_group_version(session, group_id)
+    if version is None and session is not primary:
+        session = primary
+        version = await read_group_version(session, group_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return session, version
+
+
 @router.post("/", response_model=GroupRead)
-def create_group(
+async def create_group(
     group_id: GroupCreate,
     session: SessionDep,
     current_user: CurrentUser,
@@ -27,7 +94,7 @@ def create_group(
     group = Group.model_validate(group_id)
     session.add(group)
     # Flush to get the group ID without committing the transaction yet
-    session.flush()
+    await session.flush()
 
     # Add the creator as an admin member of the group
     member = GroupMember(
@@ -36,30 +103,98 @@ def create_group(
         role="admin",
     )
     session.add(member)
-    session.commit()
-    session.refresh(group)
+    await session.commit()
+    await session.refresh(group)
 
     return group
 
 
-@router.get("/", response_model=List[GroupRead])
-def read_my_groups(
-    session: SessionDep,
+@router.get("/", response_model=List[GroupRead], response_class=ORJSONResponse)
+async def read_my_groups(
+    request: Request,
+    session: ReadSessionDep,
     current_user: CurrentUser,
 ):
     """
     Retrieve all lunch groups the current user is a member of.
+    Supports If-None-Match: the ETag changes when the user joins a group or
+    one of their groups changes.
     """
 
     statement = (
-        select(Group).join(GroupMember).where(GroupMember.user_id == current_user.id)
+        select(Group.name, Group.description, Group.id, Group.version)
+        .join(GroupMember)
+        .where(GroupMember.user_id == current_user.id)
+        .order_by(Group.id)
+    )
+    rows = (await session.exec(statement)).all()
+    etag = weak_etag(
+        "groups", current_user.id, [(group_id, version) for _, _, group_id, version in rows]
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return ORJSONResponse(
+        [
+            {"name": name, "description": description, "id": group_id}
+            for name, description, group_id, _ in rows
+        ],
+        headers=etag_headers(etag),
+    )
+
+
+@router.get("/{group_id}", response_model=GroupDetail, response_class=ORJSONResponse)
+async def read_group(
+    group_id: int,
+    request: Request,
+    session: ReadSessionDep,
+    primary: SessionDep,
+    current_user: CurrentUser,
+):
+    """
+    Details of a group the current user belongs to, with its members.
+    Supports If-None-Match (weak ETag of the group's version).
+    """
+    await require_membership(session, group_id, current_user.id)
+    session, version = await read_version_or_404(session, primary, group_id)
+    etag = weak_etag("group", group_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # The group and its members are read together rather than from the
+    # membership cache, which another worker's join may have outdated: the
+    # version in the ETag always matches the member list sent with it
+    statement = (
+        select(
+            Group.name,
+            Group.description,
+            Group.version,
+            GroupMember.user_id,
+            GroupMember.role,
+        )
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .where(Group.id == group_id)
+        .order_by(GroupMember.user_id)
+    )
+    rows = (await session.exec(statement)).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Group not found")
+    name, description, version = rows[0][:3]
+    # A write may have landed since the version was read
+    etag = weak_etag("group", group_id, version)
+    return ORJSONResponse(
+        {
+            "name": name,
+            "description": description,
+            "id": group_id,
+            "version": version,
+            "members": [{"user_id": user_id, "role": role} for *_, user_id, role in rows],
+        },
+        headers=etag_headers(etag),
     )
-    groups = session.exec(statement).all()
-    return groups
 
 
 @router.post("/{group_id}/join")
-def join_group(
+async def join_group(
     group_id: int,
     session: SessionDep,
     current_user: CurrentUser,
@@ -69,18 +204,13 @@ def join_group(
     # After can change to invite code
     """
     # Check if the group exists
-    group = session.get(Group, group_id)
+    group = await session.get(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
     # Check if the user is already a member
-    existing_member = session.exec(
-        select(GroupMember).where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id,
-        )
-    ).first()
-    if existing_member:
+    members = await get_group_members(session, group_id)
+    if members.is_member(current_user.id):
         raise HTTPException(status_code=400, detail="Already a member of the group")
 
     # Add the user as a member of the group
@@ -90,13 +220,15 @@ def join_group(
         role="member",
     )
     session.add(member)
-    session.commit()
+    await session.exec(bump_group_version(group_id))
+    await session.commit()
+    await publish_group_event(group_id, MEMBER_JOINED, member.model_dump())
 
     return {"msg": "Successfully joined the group"}
 
 
 @router.post("/{group_id}/invite", response_model=GroupInviteResponse)
-def create_invite_link(
+async def create_invite_link(
     group_id: int,
     session: SessionDep,
     current_user: CurrentUser,
@@ -106,7 +238,7 @@ def create_invite_link(
     Only admins should be able to do this (logic omitted for brevity).
     """
     # 1. Verify group existence and user permission
-    group = session.get(Group, group_id)
+    group = await session.get(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
@@ -132,7 +264,7 @@ def create_invite_link(
 
 
 @router.post("/join-by-token")
-def join_group_by_token(
+async def join_group_by_token(
     payload: JoinGroupRequest,
     session: SessionDep,
     current_user: CurrentUser,
@@ -162,14 +294,8 @@ def join_group_by_token(
     group_id = int(group_id)
 
     # 3. Check if user is already a member (Reuse logic)
-    existing_member = session.exec(
-        select(GroupMember).where(
-            GroupMember.group_id == group_id,
-            GroupMember.user_id == current_user.id,
-        )
-    ).first()
-
-    if existing_member:
+    members = await get_group_members(session, group_id)
+    if members.is_member(current_user.id):
         # Idempotency: If already member, just return success
         return {"msg": "You are already in this group"}
 
@@ -180,6 +306,214 @@ def join_group_by_token(
         role="member",
     )
     session.add(member)
-    session.commit()
+    await session.exec(bump_group_version(group_id))
+    await session.commit()
+    await publish_group_event(group_id, MEMBER_JOINED, member.model_dump())
 
     return {"msg": "Successfully joined the group via invite"}
+
+
+@router.get(
+    "/{group_id}/settlements",
+    response_model=GroupSettlements,
+    response_class=ORJSONResponse,
+)
+async def read_group_settlements(
+    group_id: int,
+    request: Request,
+    session: ReadSessionDep,
+    primary: SessionDep,
+    current_user: CurrentUser,
+):
+    """
+    Compute who owes whom in a group and the minimal set of transfers
+    needed to settle every open share.
+    Supports If-None-Match: a 304 costs one lookup of the group's version.
+    """
+    await require_membership(session, group_id, current_user.id)
+
+    session, version = await read_version_or_404(session, primary, group_id)
+    etag = weak_etag("settlements", group_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Usually precomputed in the background since the last write
+    plan = await get_settlement_plan(session, group_id, version)
+
+    return ORJSONResponse(
+        {
+            "group_id": group_id,
+            "balances": [
+                {"user_id": user_id, "net": from_cents(cents)}
+                for user_id, cents in sorted(plan.balances.items())
+                if cents != 0
+            ],
+            "transfers": [
+                {
+                    "from_user_id": debtor_id,
+                    "to_user_id": creditor_id,
+                    "amount": from_cents(cents),
+                }
+                for debtor_id, creditor_id, cents in plan.transfers
+            ],
+        },
+        headers=etag_headers(etag),
+    )
+
+
+@router.post("/{group_id}/settle", response_model=SettlementRead)
+async def settle_debt(
+    group_id: int,
+    settle_in: SettleRequest,
+    session: SessionDep,
+    current_user: CurrentUser,
+):
+    """
+    Record a payment from a debtor to a creditor: their open shares, oldest
+    first, are marked as paid, either all of them or as many as `amount`
+    covers. Only the debtor or the creditor can settle.
+    """
+    await require_membership(session, group_id, current_user.id)
+    if current_user.id not in (settle_in.debtor_id, settle_in.creditor_id):
+        raise HTTPException(
+            status_code=403, detail="Only the debtor or the creditor can settle."
+        )
+
+    try:
+        settlement = await session.run_sync(
+            settle_shares,
+            group_id,
+            settle_in.debtor_id,
+            settle_in.creditor_id,
+            settle_in.amount,
+        )
+    except NothingToSettle:
+        raise HTTPException(status_code=400, detail="Nothing to settle for this amount")
+    await session.commit()
+    await publish_group_event(group_id, SETTLEMENT_CREATED, settlement.model_dump())
+    schedule_settlement_plan(group_id)
+
+    return settlement
+
+
+@router.get("/{group_id}/events", response_class=StreamingResponse)
+async def read_group_events(
+    group_id: int,
+    session: SessionDep,
+    current_user: StreamUser,
+):
+    """
+    Live updates of a group as Server-Sent Events: expense.created,
+    expenses.imported, member.joined and settlement.created, each with a JSON
+    payload. Authenticate with the usual bearer header, or `?token=` for
+    EventSource clients.
+    """
+    await require_membership(session, group_id, current_user.id)
+    # Do not hold a database connection for the lifetime of the stream
+    await session.close()
+
+    return StreamingResponse(
+        stream_group_events(group_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{group_id}/expenses", response_model=ExpensePage, response_class=ORJSONResponse
+)
+async def read_group_expenses(
+    group_id: int,
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    payer_id: Optional[int] = None,
+    include_archived: bool = False,
+):
+    """
+    List a group's expenses newest first, with their shares.
+    Pass `next_cursor` from the previous page as `cursor` to continue.
+    Old settled expenses are archived: pass `include_archived=true` for the
+    full history.
+    """
+    await require_membership(session, group_id, current_user.id)
+
+    try:
+        page = await session.run_sync(
+            list_group_expenses,
+            group_id,
+            limit,
+            cursor=cursor,
+            start=start,
+            end=end,
+            payer_id=payer_id,
+            include_archived=include_archived,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ORJSONResponse(page)
+
+
+@router.get("/{group_id}/export")
+async def export_group_ledger(
+    group_id: int,
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    export_format: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+    include_archived: bool = False,
+):
+    """
+    Export every share of a group's expenses as CSV or NDJSON, archived
+    expenses included with `include_archived=true`.
+    The body is streamed, so even very old groups export in constant memory.
+    """
+    await require_membership(session, group_id, current_user.id)
+
+    return StreamingResponse(
+        stream_group_ledger(session, group_id, export_format, include_archived),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="group-{group_id}-ledger.{export_format}"'
+            )
+        },
+    )
+
+
+@router.post("/{group_id}/import", response_model=ExpenseImportResult)
+async def import_group_expenses(
+    group_id: int,
+    request: Request,
+    session: SessionDep,
+    current_user: CurrentUser,
+    import_format: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+):
+    """
+    Bulk import expenses from a CSV (with header) or NDJSON request body.
+    Columns/keys: amount (required), description, date (ISO 8601) and
+    payer_id (defaults to the current user). Each expense is split evenly
+    between the current members. Invalid rows are reported, not imported.
+    """
+    members = await require_membership(session, group_id, current_user.id, current=True)
+
+    try:
+        result = await import_expenses(
+            session,
+            group_id,
+            members.member_ids,
+            current_user.id,
+            request.stream(),
+            import_format,
+        )
+    except InvalidImportFile as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if result.imported:
+        # One event for the whole file: clients refetch the expense list
+        await publish_group_event(
+            group_id, EXPENSES_IMPORTED, {"group_id": group_id, "imported": result.imported}
+        )
+        schedule_settlement_plan(group_id)
+    return result
@@ -0,0 +1,39 @@
+from api.deps import CurrentUser, ReadSessionDep
+from core.etag import etag_headers, etag_matches, not_modified, weak_etag
+from core.responses import ORJSONResponse
+from fastapi import APIRouter, Request
+from schemas.settlement import MyBalances
+from services.group_version import read_user_group_versions
+from services.ledger import read_user_balances
+from services.settlement import from_cents
+
+router = APIRouter()
+
+
+@router.get("/balances", response_model=MyBalances, response_class=ORJSONResponse)
+async def read_my_balances(
+    request: Request,
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+):
+    """
+    Retrieve the current user's net position in every group, plus the total.
+    Supports If-None-Match: the ETag covers the versions of the user's groups.
+    """
+    versions = await read_user_group_versions(session, current_user.id)
+    etag = weak_etag("balances", current_user.id, versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = await session.run_sync(read_user_balances, current_user.id)
+
+    return ORJSONResponse(
+        {
+            "groups": [
+                {"group_id": group_id, "group_name": group_name, "net": from_cents(cents)}
+                for group_id, group_name, cents in rows
+            ],
+            "total": from_cents(sum(cents for _, _, cents in rows)),
+        },
+        headers=etag_headers(etag),
+    )
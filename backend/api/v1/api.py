@@ -1,4 +1,4 @@
-from api.routes import auth, expenses, groups
+from api.routes import analytics, auth, expenses, groups, me
 from fastapi import APIRouter
 
 # Other modules will be imported here later
@@ -9,10 +9,12 @@ api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(groups.router, prefix="/groups", tags=["groups"])
+api_router.include_router(analytics.router, prefix="/groups", tags=["analytics"])
 api_router.include_router(expenses.router, prefix="/expenses", tags=["expenses"])
+api_router.include_router(me.router, prefix="/me", tags=["me"])
 
 
 # Temporarily create a test endpoint to check router functionality
 @api_router.get("/ping")
-def ping():
+async def ping():
     return {"ping": "pong from v1 router"}
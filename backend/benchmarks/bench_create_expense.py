@@ -0,0 +1,53 @@
+"""
+Per-request latency of POST /expenses/ for groups of increasing size.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_create_expense --sizes 2 10 40 100 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from benchmarks.common import auth_headers, latency_summary, seed_group, seed_users, temp_database
+from core.config import settings
+from main import app
+
+
+async def run(sizes, requests):
+    results = {}
+    with temp_database() as engine:
+        user_ids = seed_users(engine, max(sizes))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for group_id, size in enumerate(sizes, start=1):
+                seed_group(engine, group_id, user_ids[:size])
+                headers = auth_headers(user_ids[0])
+                payload = {"amount": "123.45", "description": "Lunch", "group_id": group_id}
+
+                # Warm up caches and the connection
+                await client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=payload)
+
+                samples = []
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = await client.post(
+                        f"{settings.API_V1_STR}/expenses/", headers=headers, json=payload
+                    )
+                    samples.append(time.perf_counter() - started)
+                    response.raise_for_status()
+                results[f"members_{size}"] = latency_summary(samples)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 10, 40, 100])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.sizes, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Throughput of the bulk import endpoint (rows per second).
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_import --rows 50000 --members 4 --format csv
+
+On local SQLite, 50k rows split between 4 members import at roughly 8.5k to
+11k expenses/s. That is short of the tens of thousands of rows/s targeted.
+The four share rows written per expense dominate: inserting them costs
+about 1s per 50k expenses at the driver level alone, and SQLAlchemy's
+per-row parameter processing adds about 0.7s more.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from benchmarks.common import auth_headers, seed_group, seed_users, temp_database
+from core.config import settings
+from main import app
+
+
+def build_body(rows: int, member_ids, import_format: str) -> bytes:
+    rng = random.Random(42)
+    lines = []
+    if import_format == "csv":
+        lines.append("amount,description,date,payer_id")
+    for i in range(rows):
+        record = {
+            "amount": f"{rng.randint(500, 50000) / 100:.2f}",
+            "description": f"Lunch {i}",
+            "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00",
+            "payer_id": rng.choice(member_ids),
+        }
+        if import_format == "csv":
+            lines.append(",".join(str(value) for value in record.values()))
+        else:
+            lines.append(json.dumps(record))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def stream(body: bytes, chunk_size: int = 64 * 1024):
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+async def run(rows: int, members: int, import_format: str):
+    with temp_database() as engine:
+        member_ids = seed_users(engine, members)
+        group_id = seed_group(engine, 1, member_ids)
+        body = build_body(rows, member_ids, import_format)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            started = time.perf_counter()
+            response = await client.post(
+                f"{settings.API_V1_STR}/groups/{group_id}/import",
+                headers=auth_headers(member_ids[0]),
+                params={"format": import_format},
+                content=stream(body),
+            )
+            elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        result = response.json()
+
+    return {
+        "rows": rows,
+        "members": members,
+        "format": import_format,
+        "imported": result["imported"],
+        "failed": result["failed"],
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(result["imported"] / elapsed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--format", dest="import_format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.rows, args.members, args.import_format)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Latency of GET /me/balances for a user who belongs to many groups, compared
+with computing the same numbers with one aggregate query per group.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_me_balances --groups 200 --members 8 --expenses 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import httpx
+from benchmarks.common import auth_headers, latency_summary, seed_group, seed_users, temp_database
+from core.config import settings
+from main import app
+from services.expenses import insert_expenses
+from services.settlement import compute_group_balances
+from sqlmodel import Session
+
+
+def seed(engine, groups: int, members: int, expenses: int) -> int:
+    rng = random.Random(7)
+    user_ids = seed_users(engine, members * 4)
+    me = user_ids[0]
+    with Session(engine) as session:
+        for group_id in range(1, groups + 1):
+            member_ids = [me] + rng.sample(user_ids[1:], members - 1)
+            seed_group(engine, group_id, member_ids)
+            insert_expenses(
+                session,
+                group_id,
+                member_ids,
+                [
+                    {
+                        "payer_id": rng.choice(member_ids),
+                        "amount": Decimal(rng.randint(500, 30000)) / 100,
+                        "description": "Lunch",
+                        "date": datetime.now(timezone.utc),
+                    }
+                    for _ in range(expenses)
+                ],
+            )
+            session.commit()
+    return me
+
+
+async def run(groups: int, members: int, expenses: int, requests: int):
+    with temp_database() as engine:
+        me = seed(engine, groups, members, expenses)
+
+        # Baseline: one aggregate over expenseshare per group
+        samples = []
+        with Session(engine) as session:
+            for _ in range(max(1, requests // 10)):
+                started = time.perf_counter()
+                for group_id in range(1, groups + 1):
+                    compute_group_balances(session, group_id)
+                samples.append(time.perf_counter() - started)
+        baseline = latency_summary(samples)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = auth_headers(me)
+            url = f"{settings.API_V1_STR}/me/balances"
+            (await client.get(url, headers=headers)).raise_for_status()
+
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                samples.append(time.perf_counter() - started)
+            assert len(response.json()["groups"]) == groups
+
+    return {
+        "groups": groups,
+        "per_group_aggregate_queries": baseline,
+        "me_balances_endpoint": latency_summary(samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--expenses", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+    result = asyncio.run(run(args.groups, args.members, args.expenses, args.requests))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
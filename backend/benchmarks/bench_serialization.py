@@ -0,0 +1,238 @@
+"""
+Serialization cost per endpoint: building response models and letting FastAPI
+validate + dump them (before) versus plain dicts rendered by ORJSONResponse
+(after). No database or HTTP involved, only the response-building step.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_serialization --members 6 --page-size 50 --groups 100
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from benchmarks.common import latency_summary
+from core.responses import ORJSONResponse
+from models.expenses import Expense
+from models.group import Group
+from pydantic import TypeAdapter
+from schemas.expense import ExpensePage, ExpenseRead, ExpenseShareRead
+from schemas.group import GroupRead
+from schemas.settlement import (
+    GroupBalanceSummary,
+    GroupSettlements,
+    MemberBalance,
+    MyBalances,
+    SettlementTransfer,
+)
+from services.settlement import from_cents
+
+
+def measure(build, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        samples.append(time.perf_counter() - started)
+    return latency_summary(samples)
+
+
+def fastapi_dump(response_model):
+    """What FastAPI does with a returned value: validate, then dump to JSON."""
+    adapter = TypeAdapter(response_model)
+    return lambda value: adapter.dump_json(adapter.validate_python(value))
+
+
+def cases(members: int, page_size: int, groups: int):
+    now = datetime.now(timezone.utc)
+    member_ids = list(range(1, members + 1))
+    split = Decimal("12.50")
+
+    # Previous create_expense: ExpenseRead built from the inserted values
+    def create_before():
+        return fastapi_dump_expense(
+            ExpenseRead(
+                id=1,
+                amount=split * members,
+                description="Lunch",
+                group_id=1,
+                date=now,
+                payer_id=1,
+                shares=[
+                    ExpenseShareRead(user_id=u, amount=split, is_paid=u == 1)
+                    for u in member_ids
+                ],
+            )
+        )
+
+    def create_after():
+        return ORJSONResponse(
+            {
+                "amount": split * members,
+                "description": "Lunch",
+                "group_id": 1,
+                "id": 1,
+                "date": now,
+                "payer_id": 1,
+                "shares": [
+                    {"user_id": u, "amount": split, "is_paid": u == 1}
+                    for u in member_ids
+                ],
+            }
+        ).body
+
+    # Previous list_group_expenses: ORM rows dumped and re-validated
+    expenses = [
+        Expense(
+            id=i, amount=split * members, description="Lunch", group_id=1, payer_id=1, date=now
+        )
+        for i in range(page_size)
+    ]
+    share_rows = [(e.id, u, split, u == 1) for e in expenses for u in member_ids]
+    expense_rows = [
+        (e.amount, e.description, e.group_id, e.id, e.date, e.payer_id) for e in expenses
+    ]
+
+    def page_before():
+        shares = {e.id: [] for e in expenses}
+        for expense_id, user_id, amount, is_paid in share_rows:
+            shares[expense_id].append(
+                ExpenseShareRead(user_id=user_id, amount=amount, is_paid=is_paid)
+            )
+        items = [ExpenseRead(**e.model_dump(), shares=shares[e.id]) for e in expenses]
+        return fastapi_dump_page(ExpensePage(items=items, next_cursor=None))
+
+    def page_after():
+        shares = {row[3]: [] for row in expense_rows}
+        for expense_id, user_id, amount, is_paid in share_rows:
+            shares[expense_id].append(
+                {"user_id": user_id, "amount": amount, "is_paid": is_paid}
+            )
+        items = [
+            {
+                "amount": amount,
+                "description": description,
+                "group_id": group_id,
+                "id": expense_id,
+                "date": date,
+                "payer_id": payer_id,
+                "shares": shares[expense_id],
+            }
+            for amount, description, group_id, expense_id, date, payer_id in expense_rows
+        ]
+        return ORJSONResponse({"items": items, "next_cursor": None}).body
+
+    # Previous read_my_groups: ORM Group objects validated from attributes
+    group_objects = [Group(id=i, name=f"Group {i}", description="Lunch") for i in range(groups)]
+    group_rows = [(g.name, g.description, g.id) for g in group_objects]
+
+    def groups_before():
+        return fastapi_dump_groups(group_objects)
+
+    def groups_after():
+        return ORJSONResponse(
+            [
+                {"name": name, "description": description, "id": group_id}
+                for name, description, group_id in group_rows
+            ]
+        ).body
+
+    balances = {u: (u - (members + 1) / 2) * 1000 for u in member_ids}
+    transfers = [(u, 1, 500) for u in member_ids[1:]]
+
+    def settlements_before():
+        return fastapi_dump_settlements(
+            GroupSettlements(
+                group_id=1,
+                balances=[
+                    MemberBalance(user_id=u, net=from_cents(int(c)))
+                    for u, c in balances.items()
+                ],
+                transfers=[
+                    SettlementTransfer(
+                        from_user_id=d, to_user_id=c, amount=from_cents(cents)
+                    )
+                    for d, c, cents in transfers
+                ],
+            )
+        )
+
+    def settlements_after():
+        return ORJSONResponse(
+            {
+                "group_id": 1,
+                "balances": [
+                    {"user_id": u, "net": from_cents(int(c))} for u, c in balances.items()
+                ],
+                "transfers": [
+                    {"from_user_id": d, "to_user_id": c, "amount": from_cents(cents)}
+                    for d, c, cents in transfers
+                ],
+            }
+        ).body
+
+    balance_rows = [(i, f"Group {i}", (i % 7 - 3) * 250) for i in range(groups)]
+
+    def balances_before():
+        return fastapi_dump_balances(
+            MyBalances(
+                groups=[
+                    GroupBalanceSummary(group_id=g, group_name=n, net=from_cents(c))
+                    for g, n, c in balance_rows
+                ],
+                total=from_cents(sum(c for _, _, c in balance_rows)),
+            )
+        )
+
+    def balances_after():
+        return ORJSONResponse(
+            {
+                "groups": [
+                    {"group_id": g, "group_name": n, "net": from_cents(c)}
+                    for g, n, c in balance_rows
+                ],
+                "total": from_cents(sum(c for _, _, c in balance_rows)),
+            }
+        ).body
+
+    fastapi_dump_expense = fastapi_dump(ExpenseRead)
+    fastapi_dump_page = fastapi_dump(ExpensePage)
+    fastapi_dump_groups = fastapi_dump(List[GroupRead])
+    fastapi_dump_settlements = fastapi_dump(GroupSettlements)
+    fastapi_dump_balances = fastapi_dump(MyBalances)
+
+    return {
+        "POST /expenses/": (create_before, create_after),
+        "GET /groups/{id}/expenses": (page_before, page_after),
+        "GET /groups/": (groups_before, groups_after),
+        "GET /groups/{id}/settlements": (settlements_before, settlements_after),
+        "GET /me/balances": (balances_before, balances_after),
+    }
+
+
+def run(members: int, page_size: int, groups: int, repeat: int) -> dict:
+    result = {}
+    for endpoint, (before, after) in cases(members, page_size, groups).items():
+        assert json.loads(before()) == json.loads(after()), endpoint
+        result[endpoint] = {
+            "before": measure(before, repeat),
+            "after": measure(after, repeat),
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=6)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+    result = run(args.members, args.page_size, args.groups, args.repeat)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
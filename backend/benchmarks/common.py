@@ -0,0 +1,114 @@
+"""
+Shared helpers for the benchmarks: a throwaway SQLite database wired into the
+FastAPI app, bulk seeding without bcrypt, and latency statistics.
+"""
+import statistics
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from core.metrics import instrument_engine
+from core.security import create_access_token, get_password_hash
+from db.session import get_db
+from main import app
+from models.group import Group
+from models.group_member import GroupMember
+from models.user import User
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# One bcrypt hash reused by every seeded user: hashing is what we avoid measuring
+SEEDED_PASSWORD = "benchmark-password"
+_SEEDED_HASH = None
+
+
+def seeded_password_hash() -> str:
+    global _SEEDED_HASH
+    if _SEEDED_HASH is None:
+        _SEEDED_HASH = get_password_hash(SEEDED_PASSWORD)
+    return _SEEDED_HASH
+
+
+@contextmanager
+def temp_database():
+    """
+    Create a fresh SQLite file, create all tables and route the app's
+    sessions to it. Yields the sync engine used for seeding.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        instrument_engine(async_engine.sync_engine)
+
+        async def get_session_override():
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                yield session
+
+        app.dependency_overrides[get_db] = get_session_override
+        try:
+            yield engine
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            engine.dispose()
+
+
+def seed_users(engine, count: int, start_id: int = 1) -> List[int]:
+    ids = list(range(start_id, start_id + count))
+    hashed = seeded_password_hash()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User.__table__),
+            [
+                {
+                    "id": user_id,
+                    "email": f"user{user_id}@bench.local",
+                    "username": f"user{user_id}",
+                    "first_name": "Bench",
+                    "last_name": str(user_id),
+                    "hashed_password": hashed,
+                    "is_active": True,
+                }
+                for user_id in ids
+            ],
+        )
+    return ids
+
+
+def seed_group(engine, group_id: int, member_ids: Iterable[int]) -> int:
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Group.__table__).values(id=group_id, name=f"Bench group {group_id}")
+        )
+        conn.execute(
+            insert(GroupMember.__table__),
+            [
+                {"group_id": group_id, "user_id": user_id, "role": "member"}
+                for user_id in member_ids
+            ],
+        )
+    return group_id
+
+
+def auth_headers(user_id: int) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(subject=user_id)}"}
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Latency statistics in milliseconds from samples in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pct(0.50) * 1000, 3),
+        "p95_ms": round(pct(0.95) * 1000, 3),
+        "p99_ms": round(pct(0.99) * 1000, 3),
+    }
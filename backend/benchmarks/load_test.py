@@ -0,0 +1,360 @@
+"""
+Mixed-workload load test: concurrent clients log in, list their groups,
+create expenses and join groups by invite token. Reports latency percentiles
+and requests per second per endpoint as JSON, to compare runs across commits.
+
+By default the app from main.py is driven in-process (httpx ASGITransport)
+against a freshly seeded SQLite database. With --url, a running server is
+targeted instead and the dataset is created through the API.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.load_test --concurrency 20 --duration 15
+    python -m benchmarks.load_test --url http://localhost:8000 --users 50 --output run.json
+    python -m benchmarks.load_test --mix list_groups=8,create_expense=2
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from benchmarks.common import (
+    SEEDED_PASSWORD,
+    auth_headers,
+    latency_summary,
+    seed_group,
+    seed_users,
+    temp_database,
+)
+from core.config import settings
+from core.security import password_hasher
+from main import app
+from services.expenses import insert_expenses
+from sqlmodel import Session
+
+API = settings.API_V1_STR
+DEFAULT_MIX = "login=1,list_groups=4,create_expense=4,join_by_token=1"
+
+
+@dataclass
+class BenchUser:
+    email: str
+    password: str
+    headers: Dict[str, str]
+    group_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Dataset:
+    users: List[BenchUser]
+    # Invite tokens of every group, for the join_by_token scenario
+    invites: List[str]
+    # Users in at least one group, who can create expenses
+    members: List[BenchUser] = field(init=False)
+
+    def __post_init__(self):
+        self.members = [user for user in self.users if user.group_ids]
+
+
+def seed_in_process(
+    engine, users: int, groups: int, members: int, expenses: int, rng
+) -> List[BenchUser]:
+    """Bulk insert users, groups and history straight into the database."""
+    user_ids = seed_users(engine, users)
+    bench_users = {
+        user_id: BenchUser(
+            email=f"user{user_id}@bench.local",
+            password=SEEDED_PASSWORD,
+            headers=auth_headers(user_id),
+        )
+        for user_id in user_ids
+    }
+    with Session(engine) as session:
+        for group_id in range(1, groups + 1):
+            member_ids = sorted(rng.sample(user_ids, min(members, users)))
+            seed_group(engine, group_id, member_ids)
+            for user_id in member_ids:
+                bench_users[user_id].group_ids.append(group_id)
+            insert_expenses(
+                session,
+                group_id,
+                member_ids,
+                [
+                    {
+                        "payer_id": rng.choice(member_ids),
+                        "amount": Decimal(rng.randint(3000, 50000)) / 100,
+                        "description": "Lunch",
+                        "date": datetime.now(timezone.utc),
+                    }
+                    for _ in range(expenses)
+                ],
+            )
+            session.commit()
+    return list(bench_users.values())
+
+
+async def seed_over_http(
+    client: httpx.AsyncClient, users: int, groups: int, members: int, expenses: int, rng
+) -> List[BenchUser]:
+    """Create the dataset through the public API of a running server."""
+    run_id = int(time.time())
+    bench_users = []
+    for i in range(users):
+        email = f"load{run_id}-{i}@bench.local"
+        (
+            await client.post(
+                f"{API}/auth/signup",
+                json={
+                    "email": email,
+                    "username": f"load{run_id}-{i}",
+                    "first_name": "Load",
+                    "last_name": str(i),
+                    "password": SEEDED_PASSWORD,
+                },
+            )
+        ).raise_for_status()
+        response = await client.post(
+            f"{API}/auth/login/access-token",
+            data={"username": email, "password": SEEDED_PASSWORD},
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        bench_users.append(
+            BenchUser(email, SEEDED_PASSWORD, {"Authorization": f"Bearer {token}"})
+        )
+
+    for g in range(groups):
+        group_members = rng.sample(bench_users, min(members, users))
+        owner = group_members[0]
+        response = await client.post(
+            f"{API}/groups/", headers=owner.headers, json={"name": f"Load group {g}"}
+        )
+        response.raise_for_status()
+        group_id = response.json()["id"]
+        owner.group_ids.append(group_id)
+        for member in group_members[1:]:
+            (
+                await client.post(f"{API}/groups/{group_id}/join", headers=member.headers)
+            ).raise_for_status()
+            member.group_ids.append(group_id)
+        for _ in range(expenses):
+            payer = rng.choice(group_members)
+            (
+                await client.post(
+                    f"{API}/expenses/",
+                    headers=payer.headers,
+                    json={
+                        "amount": str(Decimal(rng.randint(3000, 50000)) / 100),
+                        "description": "Lunch",
+                        "group_id": group_id,
+                    },
+                )
+            ).raise_for_status()
+    return bench_users
+
+
+async def create_invites(client: httpx.AsyncClient, bench_users: List[BenchUser]) -> List[str]:
+    """One invite token per group, requested by one of its members."""
+    inviters = {}
+    for user in bench_users:
+        for group_id in user.group_ids:
+            inviters.setdefault(group_id, user)
+
+    invites = []
+    for group_id, user in inviters.items():
+        response = await client.post(f"{API}/groups/{group_id}/invite", headers=user.headers)
+        response.raise_for_status()
+        invites.append(response.json()["invite_url"].split("token=", 1)[1])
+    return invites
+
+
+# Scenarios: each sends one request and returns the response
+
+
+async def login(client: httpx.AsyncClient, data: Dataset, rng) -> httpx.Response:
+    user = rng.choice(data.users)
+    return await client.post(
+        f"{API}/auth/login/access-token",
+        data={"username": user.email, "password": user.password},
+    )
+
+
+async def list_groups(client: httpx.AsyncClient, data: Dataset, rng) -> httpx.Response:
+    return await client.get(f"{API}/groups/", headers=rng.choice(data.users).headers)
+
+
+async def create_expense(client: httpx.AsyncClient, data: Dataset, rng) -> httpx.Response:
+    user = rng.choice(data.members)
+    return await client.post(
+        f"{API}/expenses/",
+        headers=user.headers,
+        json={
+            "amount": str(Decimal(rng.randint(3000, 50000)) / 100),
+            "description": "Lunch",
+            "group_id": rng.choice(user.group_ids),
+        },
+    )
+
+
+async def join_by_token(client: httpx.AsyncClient, data: Dataset, rng) -> httpx.Response:
+    # Joining twice is a no-op, so late in a run this mostly measures the check
+    return await client.post(
+        f"{API}/groups/join-by-token",
+        headers=rng.choice(data.users).headers,
+        json={"token": rng.choice(data.invites)},
+    )
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "login": login,
+    "list_groups": list_groups,
+    "create_expense": create_expense,
+    "join_by_token": join_by_token,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """--mix type: "scenario=weight,..." (weight defaults to 1)."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}"
+            )
+        try:
+            weights[name] = int(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of {name!r} must be an integer")
+        if weights[name] <= 0:
+            raise argparse.ArgumentTypeError(f"weight of {name!r} must be positive")
+    return weights
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    data: Dataset,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](client, data, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            samples[name].append(time.perf_counter() - started)
+            errors[name] += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in names:
+        if samples[name]:
+            endpoints[name] = {
+                **latency_summary(samples[name]),
+                "errors": errors[name],
+                "rps": round(len(samples[name]) / elapsed, 1),
+            }
+    every_sample = [s for name in names for s in samples[name]]
+    total = {
+        **latency_summary(every_sample),
+        "errors": sum(errors.values()),
+        "rps": round(len(every_sample) / elapsed, 1),
+    }
+    return {"elapsed_s": round(elapsed, 2), "endpoints": endpoints, "total": total}
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    mix = args.mix
+    sizes = (args.users, args.groups, args.members, args.expenses)
+
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+            users = await seed_over_http(client, *sizes, rng)
+            data = Dataset(users, await create_invites(client, users))
+            result = await drive(client, data, mix, args.concurrency, args.duration, args.seed)
+    else:
+        with temp_database() as engine:
+            users = seed_in_process(engine, *sizes, rng)
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                    data = Dataset(users, await create_invites(client, users))
+                    # Start the bcrypt worker processes before measuring
+                    (await login(client, data, rng)).raise_for_status()
+                    result = await drive(
+                        client, data, mix, args.concurrency, args.duration, args.seed
+                    )
+            finally:
+                # The lifespan does not run under ASGITransport
+                password_hasher.shutdown()
+
+    return {
+        "commit": current_commit(),
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "mix": mix,
+        "dataset": dict(zip(("users", "groups", "members", "expenses"), sizes)),
+        **result,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in-process)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--members", type=int, default=6, help="members per group")
+    parser.add_argument("--expenses", type=int, default=20, help="expenses per group")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args(argv)
+
+    result = json.dumps(asyncio.run(run(args)), indent=2)
+    print(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(result + "\n")
+
+
+if __name__ == "__main__":
+    main()
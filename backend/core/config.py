@@ -1,8 +1,8 @@
-from typing import List, Union
+from typing import Annotated, List, Union
 import json
 
 from pydantic import AnyHttpUrl, validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -14,13 +14,62 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # 30 minutes
     DB_ECHO: bool = False
 
+    # Read replicas for read-only routes, comma separated (see db/session.py)
+    DATABASE_REPLICA_URLS: Annotated[List[str], NoDecode] = []
+    # A user's reads stay on the primary this long after they write
+    REPLICA_STICKINESS_SECONDS: int = 5
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+
+    # Password hashing (see core/security.py)
+    BCRYPT_ROUNDS: int = 12  # changing it rehashes passwords on next login
+    PASSWORD_HASH_WORKERS: int = 2  # size of the bcrypt process pool
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued hashes before answering 503
+
+    # Authenticated user cache (see services/user_cache.py)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Group membership cache (see services/membership.py)
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 300
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 10_000
+
+    # Idempotency-Key replay store (see services/idempotency.py)
+    IDEMPOTENCY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_MAX_KEYS: int = 10_000
+
+    # Background jobs (see core/jobs.py)
+    JOBS_QUEUE_SIZE: int = 1000  # waiting jobs before new ones are rejected
+    JOBS_CONCURRENCY: int = 2
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_BACKOFF_SECONDS: float = 0.5  # doubled after every failed attempt
+    JOBS_DRAIN_TIMEOUT_SECONDS: int = 10  # time given to queued jobs on shutdown
+
+    # Precomputed settlement plans (see services/settlement_plans.py)
+    SETTLEMENT_PLAN_CACHE_TTL_SECONDS: int = 3600
+    SETTLEMENT_PLAN_CACHE_MAX_SIZE: int = 10_000
+
+    # Archival of settled expenses (see services/archive.py)
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 1000  # expenses moved per transaction
+
+    # Live group updates (see core/pubsub.py)
+    PUBSUB_BACKEND: str = "memory"
+    PUBSUB_QUEUE_SIZE: int = 100  # undelivered events before a client is cut off
+    EVENTS_KEEPALIVE_SECONDS: int = 15  # idle time before a keep-alive comment
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
-    def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+    @validator("BACKEND_CORS_ORIGINS", "DATABASE_REPLICA_URLS", pre=True)
+    def split_comma_separated_list(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
-            return [i.strip() for i in v.split(",")]
+            return [i.strip() for i in v.split(",") if i.strip()]
         elif isinstance(v, str) and v.startswith("["):
             return json.loads(v)
         elif isinstance(v, list):
@@ -0,0 +1,36 @@
+"""
+Weak ETags for conditional GETs: a matching If-None-Match is answered with
+an empty 304 before the response body is built.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+# Responses depend on the caller: shared caches must not keep them, and
+# clients revalidate every time (a 304 is cheap)
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """A weak ETag derived from whatever identifies the response's state."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison (RFC 9110) of `etag` with the request's If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,172 @@
+"""
+In-process background jobs for derived work that should not sit on the
+request path (e.g. precomputing settlement plans, see
+services/settlement_plans.py).
+
+Jobs are keyed: submitting a key that is already waiting replaces the queued
+job instead of adding another one, so a burst of writes to a group runs its
+recompute once, with the latest data. A job that raises is retried with
+exponential backoff, unless a newer job for its key was submitted meanwhile.
+
+The queue is bounded (JOBS_QUEUE_SIZE): when it is full, or when the worker
+is not running, `submit` returns False and the job is not run. Jobs must
+therefore be optimizations whose result can also be computed on demand.
+On shutdown the worker stops accepting jobs and drains the queue for up to
+JOBS_DRAIN_TIMEOUT_SECONDS.
+
+Per process and in memory: queued jobs are lost if the process dies.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+from core.config import settings
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class JobWorker:
+    def __init__(
+        self,
+        maxsize: int,
+        concurrency: int,
+        max_attempts: int,
+        backoff: float,
+        drain_timeout: float,
+    ):
+        self.maxsize = maxsize
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.drain_timeout = drain_timeout
+        # key -> latest job submitted for it, while waiting to run
+        self._pending: Dict[Hashable, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting to run."""
+        return len(self._pending)
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(self.maxsize)
+        self._accepting = True
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Stop accepting jobs, run the queued ones, then stop the workers."""
+        self._accepting = False
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d background job(s) on shutdown", self.depth)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    def submit(self, key: Hashable, job: Job) -> bool:
+        """
+        Queue `job` under `key`, from the event loop the worker runs on.
+        Returns False when it will not run (worker stopped or queue full).
+        """
+        if not self._accepting:
+            self.rejected += 1
+            return False
+        if key in self._pending:
+            self._pending[key] = job
+            self.coalesced += 1
+            return True
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self._pending[key] = job
+        self.submitted += 1
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            key = await self._queue.get()
+            job = self._pending.pop(key)
+            self.running += 1
+            try:
+                await self._run(key, job)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, key: Hashable, job: Job) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == self.max_attempts:
+                    self.failed += 1
+                    logger.exception("Background job %r failed after %d attempts", key, attempt)
+                    return
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                if key in self._pending:
+                    # Superseded: the newer job runs instead of this retry
+                    return
+            else:
+                self.succeeded += 1
+                return
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "running": self.running,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    def render_metrics(self) -> List[str]:
+        """Prometheus lines for /metrics."""
+        lines = [
+            "# HELP background_jobs_queued Background jobs waiting to run.",
+            "# TYPE background_jobs_queued gauge",
+            f"background_jobs_queued {self.depth}",
+            "# HELP background_jobs_running Background jobs currently running.",
+            "# TYPE background_jobs_running gauge",
+            f"background_jobs_running {self.running}",
+            "# HELP background_jobs_total Background jobs, by outcome.",
+            "# TYPE background_jobs_total counter",
+        ]
+        for outcome in ("submitted", "coalesced", "rejected", "succeeded", "retried", "failed"):
+            lines.append(f'background_jobs_total{{outcome="{outcome}"}} {getattr(self, outcome)}')
+        return lines
+
+
+job_worker = JobWorker(
+    maxsize=settings.JOBS_QUEUE_SIZE,
+    concurrency=settings.JOBS_CONCURRENCY,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    backoff=settings.JOBS_RETRY_BACKOFF_SECONDS,
+    drain_timeout=settings.JOBS_DRAIN_TIMEOUT_SECONDS,
+)
+metrics.collectors.append(job_worker.render_metrics)
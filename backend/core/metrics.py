@@ -0,0 +1,265 @@
+"""
+Request and database metrics in the Prometheus text exposition format.
+
+Everything is recorded from the event loop thread (the DB events of the async
+engine fire in its greenlets, on the same thread), so plain integer/float
+updates are enough: no locks on the hot path. Label strings are rendered once
+per series and cached.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the latency histogram buckets, +Inf is implicit
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Route label for requests that matched no route, so 404 scans of random
+# paths cannot blow up the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+class Histogram:
+    """Per-bucket counts, made cumulative only when rendered."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class RouteSeries:
+    """Everything recorded for one (method, route) label set."""
+
+    __slots__ = ("labels", "latency", "statuses", "db_queries", "db_seconds")
+
+    def __init__(self, method: str, route: str):
+        self.labels = _labels(method=method, route=route)
+        self.latency = Histogram(REQUEST_BUCKETS)
+        # status code -> count
+        self.statuses: Dict[int, int] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+class RequestDbStats:
+    """Queries issued while serving the current request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteSeries] = {}
+        self.in_flight = 0
+        self.query_latency = Histogram(QUERY_BUCKETS)
+        # Render extra metrics kept elsewhere, e.g. background job counters
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def series(self, method: str, route: str) -> RouteSeries:
+        series = self.routes.get((method, route))
+        if series is None:
+            series = self.routes[(method, route)] = RouteSeries(method, route)
+        return series
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db: RequestDbStats,
+    ) -> None:
+        series = self.series(method, route)
+        series.latency.observe(seconds)
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        series.db_queries += db.queries
+        series.db_seconds += db.seconds
+
+    def observe_query(self, seconds: float) -> None:
+        self.query_latency.observe(seconds)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += seconds
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.in_flight = 0
+        self.query_latency = Histogram(QUERY_BUCKETS)
+
+    def render(self) -> str:
+        routes = list(self.routes.values())
+        lines = [
+            "# HELP http_requests_total Requests served, by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for series in routes:
+            for status, count in series.statuses.items():
+                lines.append(
+                    f'http_requests_total{{{series.labels},status="{status}"}} {count}'
+                )
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for series in routes:
+            lines += series.latency.render("http_request_duration_seconds", series.labels)
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP db_queries_total SQL statements issued while serving requests.",
+            "# TYPE db_queries_total counter",
+        ]
+        lines += [f"db_queries_total{{{s.labels}}} {s.db_queries}" for s in routes]
+        lines += [
+            "# HELP db_query_seconds_total Time spent in SQL while serving requests.",
+            "# TYPE db_query_seconds_total counter",
+        ]
+        lines += [f"db_query_seconds_total{{{s.labels}}} {s.db_seconds}" for s in routes]
+        lines += [
+            "# HELP db_query_duration_seconds Latency of individual SQL statements.",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        lines += self.query_latency.render("db_query_duration_seconds", "")
+        for collect in self.collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead) timing
+    every HTTP request. The route label is the matched path template, e.g.
+    /api/v1/groups/{group_id}/expenses, derived from the route left in the
+    scope by the router.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+        # id(route) -> full path template; routes live as long as the app
+        self._templates: Dict[int, str] = {}
+
+    def route_template(self, scope) -> str:
+        route = scope.get("route")
+        if route is None:
+            return UNMATCHED_ROUTE
+        template = self._templates.get(id(route))
+        if template is None:
+            template = _full_template(route, scope["path"])
+            self._templates[id(route)] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db = RequestDbStats()
+        token = _request_db_stats.set(db)
+        registry = self.registry
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            _request_db_stats.reset(token)
+            registry.observe_request(
+                scope["method"], self.route_template(scope), status, elapsed, db
+            )
+
+
+def _full_template(route, path: str) -> str:
+    """
+    Routes of included routers only know their path relative to the router
+    prefix: find the suffix of the request path they match and keep what is
+    before it as the (static) prefix. Computed once per route.
+    """
+    path_format = getattr(route, "path_format", None)
+    path_regex = getattr(route, "path_regex", None)
+    if path_format is None or path_regex is None:
+        return UNMATCHED_ROUTE
+    for i, char in enumerate(path):
+        if char == "/" and path_regex.match(path[i:]):
+            return path[:i] + path_format
+    return path_format
+
+
+def instrument_engine(engine: Engine, registry: MetricsRegistry = metrics) -> None:
+    """Time every statement run by `engine` (pass `.sync_engine` for async ones)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        registry.observe_query(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
@@ -0,0 +1,178 @@
+"""
+Publish/subscribe for live updates pushed to clients (see services/group_events.py).
+
+Publishers hand the broker an already encoded message once; it is fanned out
+to every subscriber of the channel through that subscriber's own bounded
+queue. A subscriber that falls more than PUBSUB_QUEUE_SIZE messages behind is
+closed instead of slowing publishers down or buffering without limit: its
+client reconnects and refetches.
+
+How messages travel between publishers and subscribers is up to the backend.
+`InProcessBackend` reaches the subscribers of this process only; a backend
+built on Redis pub/sub or PostgreSQL LISTEN/NOTIFY implements the same
+methods so several workers can share events (see PUBSUB_BACKEND).
+"""
+import asyncio
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Set
+
+from core.config import settings
+
+# Queued after the last message of a closed subscription
+_CLOSED = object()
+
+
+class Subscription:
+    """One listener of one channel, bound to the event loop it was created on."""
+
+    __slots__ = ("channel", "queue", "loop", "closed")
+
+    def __init__(self, channel: str, maxsize: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    def _put(self, message) -> bool:
+        """Queue a message; returns False (and closes) when the queue is full."""
+        if self.closed:
+            return True
+        if message is _CLOSED:
+            self.closed = True
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if message is _CLOSED:
+                # The listener has messages to wake up for and sees `closed`
+                return True
+            self.closed = True
+            return False
+        return True
+
+    def send(self, message: bytes) -> bool:
+        return self._call(self._put, message)
+
+    def close(self) -> None:
+        self._call(self._put, _CLOSED)
+
+    def _call(self, put: Callable, message) -> bool:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return put(message)
+        # Published from another thread/loop: hand over to the listener's loop
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(put, message)
+        return True
+
+    async def listen(self, idle_timeout: float) -> AsyncIterator[Optional[bytes]]:
+        """
+        Yield messages until the subscription is closed, and None whenever
+        `idle_timeout` seconds pass without one (time for a keep-alive).
+        """
+        while not self.closed:
+            try:
+                message = await asyncio.wait_for(self.queue.get(), idle_timeout)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if message is _CLOSED or self.closed:
+                return
+            yield message
+
+
+class PubSubBackend:
+    """
+    Transport between publishers and subscribers. The broker sets `deliver`;
+    a backend calls it for every message received, on the event loop.
+    """
+
+    deliver: Callable[[str, bytes], None]
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        raise NotImplementedError
+
+
+class InProcessBackend(PubSubBackend):
+    async def publish(self, channel: str, message: bytes) -> None:
+        self.deliver(channel, message)
+
+
+# PUBSUB_BACKEND values
+BACKENDS: Dict[str, Callable[[], PubSubBackend]] = {
+    "memory": InProcessBackend,
+}
+
+
+class Broker:
+    def __init__(self, backend: PubSubBackend, queue_size: int):
+        self.backend = backend
+        backend.deliver = self._deliver
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        # Subscribers closed because their queue was full
+        self.dropped = 0
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        self.close()
+        await self.backend.stop()
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        self.published += 1
+        await self.backend.publish(channel, message)
+
+    def _deliver(self, channel: str, message: bytes) -> None:
+        subscriptions = self._channels.get(channel)
+        if not subscriptions:
+            return
+        # Copy: subscribers of other threads may come and go meanwhile
+        for subscription in tuple(subscriptions):
+            if not subscription.send(message):
+                self.dropped += 1
+
+    @contextmanager
+    def subscribe(self, channel: str) -> Iterator[Subscription]:
+        subscription = Subscription(channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self._channels.get(channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._channels.pop(channel, None)
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self._channels.get(channel, ()))
+        return sum(len(subscriptions) for subscriptions in tuple(self._channels.values()))
+
+    def close(self) -> None:
+        """End every subscription, e.g. on shutdown so open streams finish."""
+        for subscriptions in tuple(self._channels.values()):
+            for subscription in tuple(subscriptions):
+                subscription.close()
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "subscribers": self.subscriber_count(),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+broker = Broker(BACKENDS[settings.PUBSUB_BACKEND](), settings.PUBSUB_QUEUE_SIZE)
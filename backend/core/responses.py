@@ -0,0 +1,34 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    # Money is sent as a string, like Pydantic does, so no precision is lost
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, for endpoints that build their payload
+    from plain rows/dicts instead of response models. Returning it directly
+    skips FastAPI's response_model validation, so the payload must already
+    have the documented shape.
+
+    Output matches Pydantic's: Decimals as strings, UTC datetimes with a "Z".
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,10 +1,145 @@
+from itertools import count
+from typing import Optional, Sequence
+
+from core.cache import TTLCache
 from core.config import settings
-from sqlmodel import Session, create_engine
+from core.metrics import instrument_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Async drivers used by the API for each sync driver found in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+# And back: sync drivers for offline scripts and migrations, whichever form
+# DATABASE_URL is given in
+SYNC_DRIVERS = {
+    "postgresql+asyncpg": "postgresql+psycopg2",
+    "sqlite+aiosqlite": "sqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver of a database URL for its async counterpart."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def to_sync_url(url: str) -> str:
+    """Swap the async driver of a database URL for its sync counterpart."""
+    parsed = make_url(url)
+    drivername = SYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict:
+    """Connection pool settings; SQLite uses its own pool classes and ignores them."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
 
 # echo = True help for debugging and seeing the generated SQL statements
-engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
+# Sync engine: used by offline scripts (reconciliation, data generation...)
+engine = create_engine(
+    to_sync_url(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    **pool_options(settings.DATABASE_URL),
+)
+
+# Async engine: used by the API so requests never block a threadpool slot on I/O
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    **pool_options(settings.DATABASE_URL),
+)
+
+# Count statements and DB time per request, see /metrics
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
+# expire_on_commit=False: objects stay readable after commit without lazy reloads,
+# which are not allowed on an AsyncSession
+async_session = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
 
-def get_db():
-    with Session(engine) as session:
+
+async def get_db():
+    async with async_session() as session:
         yield session
+
+
+# Read replicas: only read-only routes use them (see api/deps.py)
+replica_engines = [
+    create_async_engine(to_async_url(url), echo=settings.DB_ECHO, **pool_options(url))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
+
+
+class ReplicaRouter:
+    """
+    Picks the database of a read-only request: the replicas in turn, except
+    for users who wrote in the last `stickiness` seconds, who read from the
+    primary so they see their own writes despite replication lag. Writes are
+    recorded when a session of the user commits (see _record_write).
+
+    Recent writers are tracked per process: a load balancer should keep a
+    user on one worker for stickiness to hold across workers.
+    """
+
+    def __init__(self, replicas: Sequence[AsyncEngine], stickiness: float, **cache_options):
+        self.replicas = [
+            async_sessionmaker(
+                replica,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                # Lets caches tell replica reads (possibly stale) apart
+                info={"replica": True},
+            )
+            for replica in replicas
+        ]
+        self._turn = count()
+        # user_id -> True while the user reads their own writes
+        self.recent_writers = TTLCache(maxsize=100_000, ttl=stickiness, **cache_options)
+
+    def record_write(self, user_id: int) -> None:
+        self.recent_writers.set(user_id, True)
+
+    def replica_for(self, user_id: Optional[int]) -> Optional[async_sessionmaker]:
+        """The session factory of the replica to read from, None for the primary."""
+        if not self.replicas:
+            return None
+        if user_id is not None and self.recent_writers.get(user_id):
+            return None
+        return self.replicas[next(self._turn) % len(self.replicas)]
+
+
+replica_router = ReplicaRouter(replica_engines, settings.REPLICA_STICKINESS_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session: Session) -> None:
+    # Set by get_current_user: the session belongs to an authenticated request
+    user_id = session.info.get("user_id")
+    if user_id is not None and not session.info.get("replica"):
+        replica_router.record_write(user_id)
@@ -1,10 +1,36 @@
+from contextlib import asynccontextmanager
+
 # Import Router
 from api.v1.api import api_router
 from core.config import settings
-from fastapi import FastAPI
+from core.jobs import job_worker
+from core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from core.pubsub import broker
+from core.security import PasswordHasherBusy, password_hasher
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from services.idempotency import idempotency_store
+from services.membership import membership_cache
+from services.settlement_plans import settlement_plans
+from services.user_cache import user_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broker.start()
+    await job_worker.start()
+    yield
+    # Let queued background jobs finish (bounded by JOBS_DRAIN_TIMEOUT_SECONDS)
+    await job_worker.stop()
+    # End open event streams so the server can stop
+    await broker.stop()
+    # Stop the bcrypt worker processes
+    password_hasher.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
@@ -30,12 +56,28 @@ else:
         allow_headers=["*"],
     )
 
+# Added last so it wraps everything else and times the whole request
+app.add_middleware(MetricsMiddleware)
+
 # Include Routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """
+    Too many logins/signups are already waiting for bcrypt: shed load instead
+    of letting requests queue up behind each other.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint to monitoring tools check server status.
     """
@@ -43,4 +85,20 @@ def health_check():
         "status": "active",
         "app_name": settings.PROJECT_NAME,
         "vision": "Debt Simplification for Lunch Buddy",
+        "caches": {
+            "users": user_cache.stats(),
+            "memberships": membership_cache.stats(),
+            "idempotency_keys": idempotency_store.stats(),
+            "settlement_plans": settlement_plans.stats(),
+        },
+        "events": broker.stats(),
+        "jobs": job_worker.stats(),
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """
+    Request and database metrics in the Prometheus text format.
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class ArchivedExpense(SQLModel, table=True):
+    """
+    A fully settled expense moved out of the hot `expense` table (see
+    services/archive.py). Keeps its original id, so history pages and
+    exports can mix both tables.
+    """
+
+    __table_args__ = (
+        Index("ix_archivedexpense_group_id_date_id", "group_id", "date", "id"),
+    )
+
+    id: int = Field(primary_key=True)
+    amount: Decimal = Field(nullable=False, max_digits=12, decimal_places=2)
+    description: str = Field(nullable=False)
+    date: datetime = Field(nullable=False)
+    group_id: int = Field(foreign_key="group.id", nullable=False)
+    payer_id: int = Field(foreign_key="user.id", nullable=False)
+    archived_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class ArchivedExpenseShare(SQLModel, table=True):
+    # Also serves lookups by expense_id
+    __table_args__ = (UniqueConstraint("expense_id", "user_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    expense_id: int = Field(foreign_key="archivedexpense.id", nullable=False, ondelete="CASCADE")
+    user_id: int = Field(foreign_key="user.id", nullable=False)
+    amount: Decimal = Field(nullable=False, max_digits=12, decimal_places=2, ge=0)
+    is_paid: bool = Field(default=True, nullable=False)
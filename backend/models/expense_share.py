@@ -1,12 +1,16 @@
 from decimal import Decimal
 from typing import Optional
 
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
 class ExpenseShare(SQLModel, table=True):
+    # Matches the init migration; also serves lookups by expense_id
+    __table_args__ = (UniqueConstraint("expense_id", "user_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    expense_id: int = Field(foreign_key="expense.id", nullable=False)
-    user_id: int = Field(foreign_key="user.id", nullable=False)
+    expense_id: int = Field(foreign_key="expense.id", nullable=False, ondelete="CASCADE")
+    user_id: int = Field(foreign_key="user.id", nullable=False, index=True)
     amount: Decimal = Field(nullable=False, max_digits=12, decimal_places=2, ge=0)
     is_paid: bool = Field(default=False, nullable=False)
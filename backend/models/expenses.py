@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 from decimal import Decimal
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class Expense(SQLModel, table=True):
+    # Backs the keyset pagination of a group's history (newest first)
+    __table_args__ = (Index("ix_expense_group_id_date_id", "group_id", "date", "id"),)
+
     id: int = Field(default=None, primary_key=True)
     amount: Decimal = Field(nullable=False)
     description: str = Field(nullable=False)
     date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
     group_id: int = Field(foreign_key="group.id", nullable=False)
-    payer_id: int = Field(foreign_key="user.id", nullable=False)
+    payer_id: int = Field(foreign_key="user.id", nullable=False, index=True)
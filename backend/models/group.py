@@ -8,4 +8,7 @@ class Group(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, nullable=False, unique=True)
     description: Optional[str] = Field(default=None, nullable=True)
+    # Bumped by every write to the group (expenses, members, settlements),
+    # see services/group_version.py
+    version: int = Field(default=0, nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
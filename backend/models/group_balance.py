@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+class GroupBalance(SQLModel, table=True):
+    group_id: int = Field(foreign_key="group.id", primary_key=True)
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+
+    # Positive = the user should receive money, negative = the user owes money
+    net_cents: int = Field(default=0, nullable=False, sa_type=BigInteger)
@@ -7,7 +7,7 @@ from sqlmodel import Field, SQLModel
 class GroupMember(SQLModel, table=True):
     group_id: int = Field(foreign_key="group.id", primary_key=True)
 
-    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True, index=True)
 
     joined_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
 
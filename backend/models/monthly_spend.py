@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger
+from sqlmodel import Field, SQLModel
+
+
+class GroupMonthlySpend(SQLModel, table=True):
+    """
+    Per-member spending of a group in one calendar month (UTC), kept up to
+    date as expenses are written, so analytics never aggregate raw expenses.
+    """
+
+    group_id: int = Field(foreign_key="group.id", primary_key=True)
+    # "YYYY-MM"
+    month: str = Field(primary_key=True, max_length=7)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+
+    # Total of the expenses the user paid for
+    paid_cents: int = Field(default=0, nullable=False, sa_type=BigInteger)
+    # Total of the user's shares, i.e. what their own lunches cost
+    owed_cents: int = Field(default=0, nullable=False, sa_type=BigInteger)
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class Settlement(SQLModel, table=True):
+    """A payment from a debtor to a creditor that marked open shares as paid."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    group_id: int = Field(foreign_key="group.id", nullable=False, index=True)
+    debtor_id: int = Field(foreign_key="user.id", nullable=False)
+    creditor_id: int = Field(foreign_key="user.id", nullable=False)
+    # Sum of the shares that were settled
+    amount: Decimal = Field(nullable=False, max_digits=12, decimal_places=2)
+    shares_settled: int = Field(nullable=False)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
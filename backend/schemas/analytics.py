@@ -0,0 +1,30 @@
+from decimal import Decimal
+from typing import List
+
+from sqlmodel import SQLModel
+
+
+class MemberSpend(SQLModel):
+    user_id: int
+    # Total of the expenses the member paid for
+    paid: Decimal
+    # Total of the member's shares
+    owed: Decimal
+
+
+class MonthSpend(SQLModel):
+    # "YYYY-MM"
+    month: str
+    total: Decimal
+    members: List[MemberSpend] = []
+
+
+class GroupSpendHistory(SQLModel):
+    group_id: int
+    months: List[MonthSpend] = []
+
+
+class TopPayers(SQLModel):
+    group_id: int
+    month: str
+    payers: List[MemberSpend] = []
@@ -26,3 +26,22 @@ class ExpenseRead(ExpenseBase):
     date: datetime
     payer_id: int
     shares: List[ExpenseShareRead] = []
+
+
+class ExpensePage(SQLModel):
+    items: List[ExpenseRead] = []
+    # Opaque cursor to pass back to get the next page, None on the last page
+    next_cursor: Optional[str] = None
+
+
+class ExpenseImportError(SQLModel):
+    # Line number in the uploaded file
+    row: int
+    error: str
+
+
+class ExpenseImportResult(SQLModel):
+    imported: int = 0
+    failed: int = 0
+    # At most MAX_REPORTED_ERRORS entries, see `failed` for the full count
+    errors: List[ExpenseImportError] = []
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from sqlmodel import SQLModel
 
@@ -21,6 +21,17 @@ class GroupRead(GroupBase):
     id: int
 
 
+class GroupMemberRead(SQLModel):
+    user_id: int
+    role: str
+
+
+class GroupDetail(GroupRead):
+    # Changes with every write to the group, see the ETag header
+    version: int
+    members: List[GroupMemberRead]
+
+
 class JoinGroupRequest(SQLModel):
     token: str
 
@@ -0,0 +1,53 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class MemberBalance(SQLModel):
+    user_id: int
+    # Positive = should receive money, negative = owes money
+    net: Decimal
+
+
+class SettlementTransfer(SQLModel):
+    from_user_id: int
+    to_user_id: int
+    amount: Decimal
+
+
+class GroupSettlements(SQLModel):
+    group_id: int
+    balances: List[MemberBalance] = []
+    transfers: List[SettlementTransfer] = []
+
+
+class GroupBalanceSummary(SQLModel):
+    group_id: int
+    group_name: str
+    # Positive = should receive money, negative = owes money
+    net: Decimal
+
+
+class MyBalances(SQLModel):
+    groups: List[GroupBalanceSummary] = []
+    total: Decimal
+
+
+class SettleRequest(SQLModel):
+    debtor_id: int
+    creditor_id: int
+    # Settle the oldest open shares whose total fits in this amount;
+    # None settles every open share between the two members
+    amount: Optional[Decimal] = Field(default=None, gt=0, max_digits=12, decimal_places=2)
+
+
+class SettlementRead(SQLModel):
+    id: int
+    group_id: int
+    debtor_id: int
+    creditor_id: int
+    amount: Decimal
+    shares_settled: int
+    created_at: datetime
@@ -0,0 +1,46 @@
+"""
+Move fully settled expenses older than ARCHIVE_AFTER_DAYS, with their shares,
+to the archive tables, one batch per transaction. Safe to stop and rerun.
+
+Usage (from the backend/ directory):
+    python -m scripts.archive_expenses
+    python -m scripts.archive_expenses --older-than-days 365 --batch-size 500
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from core.config import settings
+from db.session import engine
+from services.archive import archive_settled_expenses
+from sqlmodel import Session
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.ARCHIVE_AFTER_DAYS,
+        help="Only archive expenses older than this (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.ARCHIVE_BATCH_SIZE,
+        help="Expenses moved per transaction (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        archived = archive_settled_expenses(
+            session, timedelta(days=args.older_than_days), args.batch_size
+        )
+    print(f"{archived} expense(s) archived in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Fill the configured database (DATABASE_URL) with a large synthetic dataset for
+scale testing: users, groups with skewed sizes and activity, expenses and their
+shares. Rows are written with bulk INSERTs, bypassing the API and the ORM;
+every user shares one precomputed bcrypt hash. The ledger (GroupBalance) and
+the monthly rollup (GroupMonthlySpend) are rebuilt at the end. Output is
+deterministic for a given --seed and --end.
+
+The target tables must exist and be empty (run `alembic upgrade head` first,
+or pass --create-tables for a throwaway database).
+
+Usage (from the backend/ directory):
+    python -m scripts.generate_dataset                      # 100k/10k/10M
+    python -m scripts.generate_dataset --users 1000 --groups 100 --expenses 50000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, List
+
+from core.security import get_password_hash
+from db.session import engine
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.group import Group
+from models.group_member import GroupMember
+from models.user import User
+from services.expenses import split_evenly
+from services.ledger import reconcile_balances
+from services.rollups import rebuild_monthly_spend
+from sqlalchemy import func, insert, text
+from sqlmodel import Session, SQLModel, select
+
+DEFAULT_PASSWORD = "password123"
+DESCRIPTIONS = ["Com tam", "Pho", "Bun cha", "Banh mi", "Bun bo", "Hu tieu", "Coffee"]
+
+
+def group_sizes(rng: random.Random, groups: int, users: int, min_size: int, max_size: int) -> List[int]:
+    """Pareto-distributed sizes: mostly small groups, a long tail of big ones."""
+    max_size = min(max_size, users)
+    return [
+        min(max_size, int(min_size * rng.paretovariate(1.5)))
+        for _ in range(groups)
+    ]
+
+
+def expense_counts(rng: random.Random, sizes: List[int], total: int) -> List[int]:
+    """
+    Split `total` expenses between groups with a skewed activity factor, so a
+    few groups get most of the traffic. Activity does not grow with the size,
+    which keeps shares at about `total` times the mean group size.
+    """
+    weights = [rng.paretovariate(1.2) for _ in sizes]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Hand out what rounding left over to the busiest groups
+    busiest = sorted(range(len(sizes)), key=weights.__getitem__, reverse=True)
+    for i in range(total - sum(counts)):
+        counts[busiest[i % len(busiest)]] += 1
+    return counts
+
+
+def insert_users(conn, count: int, hashed_password: str, batch_size: int) -> None:
+    for start in range(1, count + 1, batch_size):
+        conn.execute(
+            insert(User.__table__),
+            [
+                {
+                    "id": user_id,
+                    "email": f"user{user_id}@example.com",
+                    "username": f"user{user_id}",
+                    "first_name": "User",
+                    "last_name": str(user_id),
+                    "hashed_password": hashed_password,
+                    "is_active": True,
+                }
+                for user_id in range(start, min(start + batch_size, count + 1))
+            ],
+        )
+
+
+def bulk_insert(conn, table, columns: List[str], rows: List[tuple]) -> None:
+    """
+    executemany straight through the DBAPI: SQLAlchemy's per-row parameter
+    processing costs more than the INSERT itself at this volume. Values must
+    already be in their database form (see bind_processor below).
+    """
+    preparer = conn.dialect.identifier_preparer
+    statement = (
+        f"INSERT INTO {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(column) for column in columns)}) VALUES "
+    )
+    if conn.dialect.driver == "psycopg2":
+        # psycopg2's executemany is one round trip per row, send pages of rows
+        from psycopg2.extras import execute_values
+
+        with conn.connection.cursor() as cursor:
+            execute_values(cursor, statement + "%s", rows, page_size=1000)
+        return
+
+    marker = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+    conn.exec_driver_sql(
+        statement + f"({', '.join([marker] * len(columns))})", rows
+    )
+
+
+def bind_processor(conn, column) -> Callable:
+    """The conversion SQLAlchemy would apply to values of `column`."""
+    return column.type.bind_processor(conn.dialect) or (lambda value: value)
+
+
+def generate(args) -> dict:
+    rng = random.Random(args.seed)
+    end = args.end.replace(tzinfo=timezone.utc)
+    span_seconds = args.days * 86400
+    # One hash for everybody: bcrypt per user would take hours
+    hashed_password = get_password_hash(args.password)
+    counts = {"users": args.users, "groups": args.groups, "members": 0, "expenses": 0, "shares": 0}
+
+    with engine.begin() as conn:
+        insert_users(conn, args.users, hashed_password, args.batch_size)
+
+        sizes = group_sizes(rng, args.groups, args.users, args.min_group_size, args.max_group_size)
+        conn.execute(
+            insert(Group.__table__),
+            [
+                {
+                    "id": group_id,
+                    "name": f"Lunch group {group_id}",
+                    "description": None,
+                    "created_at": end - timedelta(seconds=span_seconds),
+                }
+                for group_id in range(1, args.groups + 1)
+            ],
+        )
+        members = []
+        member_rows = []
+        for group_id, size in enumerate(sizes, start=1):
+            member_ids = sorted(rng.sample(range(1, args.users + 1), size))
+            members.append(member_ids)
+            member_rows.extend(
+                {
+                    "group_id": group_id,
+                    "user_id": user_id,
+                    "joined_at": end - timedelta(seconds=span_seconds),
+                    "role": "admin" if i == 0 else "member",
+                }
+                for i, user_id in enumerate(member_ids)
+            )
+        for start in range(0, len(member_rows), args.batch_size):
+            conn.execute(insert(GroupMember.__table__), member_rows[start : start + args.batch_size])
+        counts["members"] = len(member_rows)
+
+    expense_table, share_table = Expense.__table__, ExpenseShare.__table__
+    expense_columns = ["id", "amount", "description", "date", "group_id", "payer_id"]
+    share_columns = ["expense_id", "user_id", "amount", "is_paid"]
+    with engine.connect() as conn:
+        to_amount = bind_processor(conn, expense_table.c.amount)
+        to_date = bind_processor(conn, expense_table.c.date)
+
+    expense_id = 0
+    expense_rows, share_rows = [], []
+
+    def flush() -> None:
+        with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                # 256 MB page cache: keeps the share indexes in memory while they grow
+                conn.exec_driver_sql("PRAGMA cache_size = -262144")
+            bulk_insert(conn, expense_table, expense_columns, expense_rows)
+            bulk_insert(conn, share_table, share_columns, share_rows)
+        counts["expenses"] += len(expense_rows)
+        counts["shares"] += len(share_rows)
+        expense_rows.clear()
+        share_rows.clear()
+
+    for group_id, (member_ids, count) in enumerate(
+        zip(members, expense_counts(rng, sizes, args.expenses)), start=1
+    ):
+        for _ in range(count):
+            expense_id += 1
+            payer_id = rng.choice(member_ids)
+            cents = rng.randint(3_000, 60_000)
+            amount = Decimal(cents) / 100
+            expense_rows.append(
+                (
+                    expense_id,
+                    to_amount(amount),
+                    rng.choice(DESCRIPTIONS),
+                    to_date(end - timedelta(seconds=rng.randrange(span_seconds))),
+                    group_id,
+                    payer_id,
+                )
+            )
+            split = to_amount(split_evenly(amount, len(member_ids)))
+            share_rows.extend(
+                (
+                    expense_id,
+                    user_id,
+                    split,
+                    # The payer's own share is settled by definition
+                    user_id == payer_id or rng.random() < args.paid_ratio,
+                )
+                for user_id in member_ids
+            )
+            if len(share_rows) >= args.batch_size:
+                flush()
+                print(f"  {counts['expenses']:,} expenses", file=sys.stderr, end="\r")
+    if expense_rows:
+        flush()
+    return counts
+
+
+def reset_sequences(session: Session) -> None:
+    """Explicit ids leave Postgres sequences behind: move them past MAX(id)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    for model in (User, Group, Expense, ExpenseShare):
+        table = model.__table__.name
+        session.exec(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+            )
+        )
+    session.commit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--groups", type=int, default=10_000)
+    parser.add_argument("--expenses", type=int, default=10_000_000)
+    parser.add_argument("--min-group-size", type=int, default=2)
+    parser.add_argument("--max-group-size", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365, help="history length")
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=datetime(2025, 1, 1),
+        help="date of the most recent expense (UTC, default 2025-01-01)",
+    )
+    parser.add_argument(
+        "--paid-ratio", type=float, default=0.7, help="share of debts already paid"
+    )
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password of every user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per INSERT")
+    parser.add_argument("--create-tables", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.create_tables:
+        SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.exec(select(func.count()).select_from(User)).one():
+            print("The user table is not empty, refusing to generate", file=sys.stderr)
+            return 1
+
+    started = time.perf_counter()
+    counts = generate(args)
+    generated = time.perf_counter()
+    with Session(engine) as session:
+        reset_sequences(session)
+        reconcile_balances(session)
+        rebuild_monthly_spend(session)
+    finished = time.perf_counter()
+
+    print(", ".join(f"{count:,} {name}" for name, count in counts.items()))
+    print(f"generated in {generated - started:.1f}s, ledger and rollup rebuilt in {finished - generated:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Rebuild the monthly spending rollup (GroupMonthlySpend) from the expense
+tables, e.g. after the migration that adds it or a bulk load that bypassed
+the API.
+
+Usage (from the backend/ directory):
+    python -m scripts.rebuild_rollups
+"""
+import argparse
+import sys
+import time
+
+from db.session import engine
+from services.rollups import rebuild_monthly_spend
+from sqlmodel import Session
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        rows = rebuild_monthly_spend(session)
+    print(f"{rows} rollup row(s) rebuilt in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
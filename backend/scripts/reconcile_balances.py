@@ -0,0 +1,43 @@
+"""
+Rebuild the per-group balance ledger (GroupBalance) from the expense tables
+and report any drift between the stored and the recomputed balances.
+
+Usage (from the backend/ directory):
+    python -m scripts.reconcile_balances            # rebuild and report
+    python -m scripts.reconcile_balances --dry-run  # only report
+"""
+import argparse
+import sys
+
+from db.session import engine
+from services.ledger import reconcile_balances
+from services.settlement import from_cents
+from sqlmodel import Session
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Compare the ledger with the expense tables without rewriting it",
+    )
+    args = parser.parse_args(argv)
+
+    with Session(engine) as session:
+        drift = reconcile_balances(session, apply=not args.dry_run)
+
+    for group_id, user_id, ledger_cents, expected_cents in drift:
+        print(
+            f"group={group_id} user={user_id} "
+            f"ledger={from_cents(ledger_cents)} expected={from_cents(expected_cents)}"
+        )
+    action = "found" if args.dry_run else "fixed"
+    print(f"{len(drift)} drifted balance(s) {action}")
+
+    # Non-zero exit on drift so the command can be used as a health check
+    return 1 if drift and args.dry_run else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Archival of settled history: expenses whose every share is paid, older than
+ARCHIVE_AFTER_DAYS, move from the hot expense/expenseshare tables to
+archivedexpense/archivedexpenseshare, so the hot tables and their indexes only
+grow with the open part of the ledger.
+
+Nothing but history reads them once settled: the ledger and the monthly
+rollup already account for them, and shares never go back to unpaid.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from models.archive import ArchivedExpense, ArchivedExpenseShare
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from sqlalchemy import delete, exists, insert, literal
+from sqlmodel import Session, select
+
+EXPENSE_COLUMNS = ["id", "amount", "description", "date", "group_id", "payer_id"]
+SHARE_COLUMNS = ["id", "expense_id", "user_id", "amount", "is_paid"]
+
+
+def archivable_expense_ids(session: Session, cutoff: datetime, limit: int) -> List[int]:
+    """Ids of fully settled expenses dated before `cutoff`, oldest ids first."""
+    open_share = exists().where(
+        ExpenseShare.expense_id == Expense.id,
+        ExpenseShare.is_paid == False,  # noqa: E712
+    )
+    statement = (
+        select(Expense.id)
+        .where(Expense.date < cutoff, ~open_share)
+        .order_by(Expense.id)
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+
+def archive_batch(session: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Move up to `batch_size` archivable expenses and their shares, with
+    set-based INSERT ... SELECT and DELETE statements, in one transaction.
+    Returns the number of expenses moved. Commits.
+    """
+    expense_ids = archivable_expense_ids(session, cutoff, batch_size)
+    if not expense_ids:
+        return 0
+
+    expense_table, share_table = Expense.__table__, ExpenseShare.__table__
+    archived_at = literal(datetime.now(timezone.utc), ArchivedExpense.__table__.c.archived_at.type)
+    session.exec(
+        insert(ArchivedExpense.__table__).from_select(
+            EXPENSE_COLUMNS + ["archived_at"],
+            select(
+                *(expense_table.c[column] for column in EXPENSE_COLUMNS), archived_at
+            ).where(expense_table.c.id.in_(expense_ids)),
+        )
+    )
+    session.exec(
+        insert(ArchivedExpenseShare.__table__).from_select(
+            SHARE_COLUMNS,
+            select(*(share_table.c[column] for column in SHARE_COLUMNS)).where(
+                share_table.c.expense_id.in_(expense_ids)
+            ),
+        )
+    )
+    session.exec(delete(ExpenseShare).where(ExpenseShare.expense_id.in_(expense_ids)))
+    session.exec(delete(Expense).where(Expense.id.in_(expense_ids)))
+    session.commit()
+    return len(expense_ids)
+
+
+def archive_settled_expenses(
+    session: Session, older_than: timedelta, batch_size: int
+) -> int:
+    """
+    Archive every fully settled expense older than `older_than`, one batch
+    per transaction so locks stay short and the job can be stopped at any
+    point. Returns the number of expenses archived.
+    """
+    cutoff = datetime.now(timezone.utc) - older_than
+    archived = 0
+    while True:
+        moved = archive_batch(session, cutoff, batch_size)
+        archived += moved
+        if moved < batch_size:
+            return archived
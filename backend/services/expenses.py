@@ -0,0 +1,274 @@
+import base64
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.archive import ArchivedExpense, ArchivedExpenseShare
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from services.group_version import bump_group_version
+from services.ledger import apply_balance_deltas
+from services.rollups import SpendDeltas, apply_spend_deltas, month_of
+from services.settlement import to_cents
+from sqlalchemy import insert, tuple_, union_all
+from sqlmodel import Session, select
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(date: datetime, expense_id: int) -> str:
+    """Encode the (date, id) position of the last returned expense."""
+    raw = json.dumps([date.isoformat(), expense_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, expense_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date), int(expense_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def load_shares(
+    session: Session, expense_ids: List[int], include_archived: bool = False
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Load the shares of many expenses in one query, grouped by expense id,
+    as plain dicts shaped like ExpenseShareRead. With `include_archived`,
+    shares of archived expenses are looked up too.
+    """
+    shares: Dict[int, List[Dict[str, Any]]] = {expense_id: [] for expense_id in expense_ids}
+    if not expense_ids:
+        return shares
+
+    def share_select(model):
+        return select(model.expense_id, model.user_id, model.amount, model.is_paid).where(
+            model.expense_id.in_(expense_ids)
+        )
+
+    if include_archived:
+        found = union_all(
+            share_select(ExpenseShare), share_select(ArchivedExpenseShare)
+        ).subquery()
+        statement = select(*found.c).order_by(found.c.expense_id, found.c.user_id)
+    else:
+        statement = share_select(ExpenseShare).order_by(
+            ExpenseShare.expense_id, ExpenseShare.user_id
+        )
+    for expense_id, user_id, amount, is_paid in session.exec(statement):
+        shares[expense_id].append(
+            {"user_id": user_id, "amount": amount, "is_paid": is_paid}
+        )
+    return shares
+
+
+def _history_page(
+    model,
+    group_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    payer_id: Optional[int],
+):
+    """A page of `model` (Expense or ArchivedExpense), plus one extra row."""
+    statement = select(
+        model.amount,
+        model.description,
+        model.group_id,
+        model.id,
+        model.date,
+        model.payer_id,
+    ).where(model.group_id == group_id)
+    if start is not None:
+        statement = statement.where(model.date >= start)
+    if end is not None:
+        statement = statement.where(model.date < end)
+    if payer_id is not None:
+        statement = statement.where(model.payer_id == payer_id)
+    if after is not None:
+        statement = statement.where(tuple_(model.date, model.id) < tuple_(*after))
+
+    # Fetch one extra row to know whether there is a next page
+    return statement.order_by(model.date.desc(), model.id.desc()).limit(limit + 1)
+
+
+def list_group_expenses(
+    session: Session,
+    group_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    payer_id: Optional[int] = None,
+    include_archived: bool = False,
+) -> Dict[str, Any]:
+    """
+    One page of a group's expenses, newest first, as a dict shaped like
+    ExpensePage. Built straight from the selected columns: serializing it
+    needs no model validation.
+
+    Keyset pagination on (date, id): each page seeks straight to its first row
+    through the (group_id, date, id) index, so deep pages cost the same as the
+    first one (unlike OFFSET). With `include_archived`, the same page is taken
+    from the archive through its own index and the two are merged; archived
+    expenses keep their ids, so cursors work across both.
+    """
+    after = decode_cursor(cursor) if cursor is not None else None
+    statement = _history_page(Expense, group_id, limit, after, start, end, payer_id)
+    if include_archived:
+        archived = _history_page(ArchivedExpense, group_id, limit, after, start, end, payer_id)
+        history = union_all(
+            select(statement.subquery()), select(archived.subquery())
+        ).subquery()
+        statement = (
+            select(*history.c)
+            .order_by(history.c.date.desc(), history.c.id.desc())
+            .limit(limit + 1)
+        )
+    rows = session.exec(statement).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    shares = load_shares(session, [row.id for row in rows], include_archived)
+    items = [
+        {
+            "amount": row.amount,
+            "description": row.description,
+            "group_id": row.group_id,
+            "id": row.id,
+            "date": row.date,
+            "payer_id": row.payer_id,
+            "shares": shares[row.id],
+        }
+        for row in rows
+    ]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def split_evenly(amount: Decimal, member_count: int) -> Decimal:
+    """Each member's share of an expense, rounded to cents."""
+    return round(Decimal(amount) / Decimal(member_count), 2)
+
+
+def insert_expenses(
+    session: Session,
+    group_id: int,
+    member_ids: Sequence[int],
+    expenses: Sequence[dict],
+) -> List[int]:
+    """
+    Insert many expenses of a group, each split evenly between `member_ids`,
+    using set-based statements: one executemany INSERT ... RETURNING for the
+    expenses, one executemany for all of their shares and one upsert each for
+    the balance ledger and the monthly rollup, whatever the number of
+    expenses or members.
+
+    `expenses` are dicts with payer_id, amount, description and date.
+    Returns the new expense ids. The caller commits.
+    """
+    expense_table = Expense.__table__
+    # Shares are derived from the RETURNING rows themselves, so the ids do not
+    # need to come back in input order (sort_by_parameter_order would make
+    # SQLite fall back to one INSERT per row).
+    inserted = session.exec(
+        insert(expense_table).returning(
+            expense_table.c.id,
+            expense_table.c.payer_id,
+            expense_table.c.amount,
+            expense_table.c.date,
+        ),
+        params=[{**expense, "group_id": group_id} for expense in expenses],
+    ).all()
+
+    share_rows = []
+    # Ledger deltas in cents: the payer is owed every other member's share
+    deltas = dict.fromkeys(member_ids, 0)
+    member_count = len(member_ids)
+    spend: SpendDeltas = {}
+    splits: Dict[Decimal, Tuple[Decimal, int]] = {}
+    for expense_id, payer_id, amount, date in inserted:
+        # Lunches repeat the same amounts a lot: split each distinct one once
+        if amount not in splits:
+            split_amount = split_evenly(amount, member_count)
+            splits[amount] = (split_amount, to_cents(split_amount))
+        split_amount, split_cents = splits[amount]
+
+        share_rows.extend(
+            {
+                "expense_id": expense_id,
+                "user_id": user_id,
+                "amount": split_amount,
+                "is_paid": user_id == payer_id,
+            }
+            for user_id in member_ids
+        )
+        for user_id in member_ids:
+            deltas[user_id] -= split_cents
+        # The payer's own share is paid: it cancels out of the ledger
+        deltas[payer_id] += split_cents * member_count
+
+        month = month_of(date)
+        for user_id in member_ids:
+            spend.setdefault((month, user_id), [0, 0])[1] += split_cents
+        spend.setdefault((month, payer_id), [0, 0])[0] += to_cents(amount)
+
+    session.exec(insert(ExpenseShare.__table__), params=share_rows)
+    apply_balance_deltas(session, group_id, deltas)
+    apply_spend_deltas(session, group_id, spend)
+    session.exec(bump_group_version(group_id))
+    return [expense_id for expense_id, _, _, _ in inserted]
+
+
+def insert_expense(
+    session: Session,
+    group_id: int,
+    payer_id: int,
+    amount: Decimal,
+    description: Optional[str],
+    member_ids: Sequence[int],
+    date: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Insert a single expense (see insert_expenses) and build its response,
+    a dict shaped like ExpenseRead, straight from the inserted values.
+    The caller commits.
+    """
+    date = date or datetime.now(timezone.utc)
+    [expense_id] = insert_expenses(
+        session,
+        group_id,
+        member_ids,
+        [
+            {
+                "payer_id": payer_id,
+                "amount": amount,
+                "description": description,
+                "date": date,
+            }
+        ],
+    )
+
+    split_amount = split_evenly(amount, len(member_ids))
+    return {
+        "amount": amount,
+        "description": description,
+        "group_id": group_id,
+        "id": expense_id,
+        "date": date,
+        "payer_id": payer_id,
+        "shares": [
+            {"user_id": user_id, "amount": split_amount, "is_paid": user_id == payer_id}
+            for user_id in member_ids
+        ],
+    }
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from models.archive import ArchivedExpense, ArchivedExpenseShare
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.user import User
+from sqlalchemy import union_all
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Rows fetched per round trip while streaming
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "expense_id",
+    "date",
+    "description",
+    "expense_amount",
+    "payer_id",
+    "payer_name",
+    "user_id",
+    "user_name",
+    "share_amount",
+    "is_paid",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _ledger_select(expense_model, share_model, group_id: int):
+    payer = aliased(User)
+    debtor = aliased(User)
+    return (
+        select(
+            expense_model.id.label("expense_id"),
+            expense_model.date,
+            expense_model.description,
+            expense_model.amount.label("expense_amount"),
+            expense_model.payer_id,
+            payer.first_name.label("payer_first_name"),
+            payer.last_name.label("payer_last_name"),
+            share_model.user_id,
+            debtor.first_name.label("user_first_name"),
+            debtor.last_name.label("user_last_name"),
+            share_model.amount.label("share_amount"),
+            share_model.is_paid,
+        )
+        .join(share_model, share_model.expense_id == expense_model.id)
+        .join(payer, payer.id == expense_model.payer_id)
+        .join(debtor, debtor.id == share_model.user_id)
+        .where(expense_model.group_id == group_id)
+    )
+
+
+def ledger_statement(group_id: int, include_archived: bool = False):
+    """
+    One row per share of the group, with payer and debtor names, oldest
+    expense first. With `include_archived`, archived expenses are merged in.
+    """
+    if not include_archived:
+        return _ledger_select(Expense, ExpenseShare, group_id).order_by(
+            Expense.date, Expense.id, ExpenseShare.user_id
+        )
+    ledger = union_all(
+        _ledger_select(Expense, ExpenseShare, group_id),
+        _ledger_select(ArchivedExpense, ArchivedExpenseShare, group_id),
+    ).subquery()
+    return select(*ledger.c).order_by(ledger.c.date, ledger.c.expense_id, ledger.c.user_id)
+
+
+def _to_record(row) -> list:
+    (
+        expense_id,
+        date,
+        description,
+        expense_amount,
+        payer_id,
+        payer_first,
+        payer_last,
+        user_id,
+        user_first,
+        user_last,
+        share_amount,
+        is_paid,
+    ) = row
+    return [
+        expense_id,
+        date.isoformat(),
+        description,
+        str(expense_amount),
+        payer_id,
+        f"{payer_first} {payer_last}",
+        user_id,
+        f"{user_first} {user_last}",
+        str(share_amount),
+        bool(is_paid),
+    ]
+
+
+async def stream_group_ledger(
+    session: AsyncSession, group_id: int, export_format: str, include_archived: bool = False
+) -> AsyncIterator[str]:
+    """
+    Stream a group's ledger as CSV or NDJSON.
+
+    Rows come from a server-side cursor (yield_per) and are encoded one batch
+    at a time, so memory stays constant whatever the size of the group.
+    """
+    statement = ledger_statement(group_id, include_archived).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+    result = await session.stream(statement)
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        async for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(_to_record(row) for row in partition)
+            yield buffer.getvalue()
+    else:
+        async for partition in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, _to_record(row)))) + "\n"
+                for row in partition
+            )
@@ -0,0 +1,45 @@
+"""
+Live group updates: what the group screen used to poll for, pushed as
+Server-Sent Events. Routes publish after their transaction commits, so
+clients never see a change that was rolled back.
+"""
+from typing import Any, AsyncIterator
+
+from core.config import settings
+from core.pubsub import broker
+from core.responses import dumps
+
+# Event types
+EXPENSE_CREATED = "expense.created"
+EXPENSES_IMPORTED = "expenses.imported"
+MEMBER_JOINED = "member.joined"
+SETTLEMENT_CREATED = "settlement.created"
+
+# Sent first, so clients know the stream is live and refetch what they missed
+CONNECTED = b": connected\n\n"
+KEEPALIVE = b": keep-alive\n\n"
+
+
+def group_channel(group_id: int) -> str:
+    return f"group:{group_id}"
+
+
+def encode_event(event_type: str, data: Any) -> bytes:
+    return b"event: " + event_type.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def publish_group_event(group_id: int, event_type: str, data: Any) -> None:
+    # Encoded once, whatever the number of subscribers
+    await broker.publish(group_channel(group_id), encode_event(event_type, data))
+
+
+async def stream_group_events(group_id: int) -> AsyncIterator[bytes]:
+    """
+    The body of a group's event stream: events as they are published, with a
+    keep-alive comment when idle so proxies keep the connection open and
+    closed clients are noticed. Ends when the broker closes the subscription.
+    """
+    with broker.subscribe(group_channel(group_id)) as subscription:
+        yield CONNECTED
+        async for message in subscription.listen(settings.EVENTS_KEEPALIVE_SECONDS):
+            yield KEEPALIVE if message is None else message
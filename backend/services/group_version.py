@@ -0,0 +1,42 @@
+"""
+Per-group version counter behind the ETags of group reads (see core/etag.py).
+
+Every write to a group's data bumps Group.version in the writing
+transaction, so a reader can tell "nothing changed" from one indexed
+lookup instead of recomputing and reserializing the response.
+"""
+from typing import List, Optional, Tuple
+
+from models.group import Group
+from models.group_member import GroupMember
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def bump_group_version(group_id: int):
+    """
+    The UPDATE to run (session.exec) alongside any write to the group's
+    expenses, members or settlements. Atomic, so concurrent writers never
+    reuse a version.
+    """
+    return update(Group).where(Group.id == group_id).values(version=Group.version + 1)
+
+
+async def read_group_version(session: AsyncSession, group_id: int) -> Optional[int]:
+    return (
+        await session.exec(select(Group.version).where(Group.id == group_id))
+    ).first()
+
+
+async def read_user_group_versions(
+    session: AsyncSession, user_id: int
+) -> List[Tuple[int, int]]:
+    """(group_id, version) of every group the user belongs to."""
+    statement = (
+        select(Group.id, Group.version)
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .where(GroupMember.user_id == user_id)
+        .order_by(Group.id)
+    )
+    return (await session.exec(statement)).all()
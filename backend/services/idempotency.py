@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, NamedTuple, Optional
+
+from core.cache import TTLCache
+from core.config import settings
+
+
+class StoredResponse(NamedTuple):
+    # Digest of the request the response was produced for
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+
+def request_fingerprint(body: str) -> str:
+    return hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+
+
+class IdempotencySlot:
+    """What a request holding an idempotency key may see and do."""
+
+    __slots__ = ("_store", "_key", "response")
+
+    def __init__(self, store: "IdempotencyStore", key: Hashable, response: Optional[StoredResponse]):
+        self._store = store
+        self._key = key
+        # Set when the request was already served: replay it
+        self.response = response
+
+    def save(self, fingerprint: str, status_code: int, body: bytes) -> None:
+        self._store.responses.set(self._key, StoredResponse(fingerprint, status_code, body))
+
+
+class IdempotencyStore:
+    """
+    Responses of requests sent with an Idempotency-Key, keyed by (user id,
+    key), kept IDEMPOTENCY_TTL_SECONDS in a bounded LRU. A retry gets the
+    stored response without running the request again.
+
+    Requests with the same key are serialized: a duplicate that arrives while
+    the first one is still running waits for it, then replays its response
+    (or runs itself if the first one stored nothing, e.g. it failed).
+
+    Per process: with several workers, retries are only deduplicated when
+    they reach the same worker.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> set when the request holding the key finishes
+        self._in_flight: Dict[Hashable, asyncio.Event] = {}
+
+    @asynccontextmanager
+    async def claim(self, user_id: int, key: str) -> AsyncIterator[IdempotencySlot]:
+        cache_key = (user_id, key)
+        while (in_flight := self._in_flight.get(cache_key)) is not None:
+            await in_flight.wait()
+
+        stored = self.responses.get(cache_key)
+        if stored is not None:
+            yield IdempotencySlot(self, cache_key, stored)
+            return
+
+        done = self._in_flight[cache_key] = asyncio.Event()
+        try:
+            yield IdempotencySlot(self, cache_key, None)
+        finally:
+            del self._in_flight[cache_key]
+            done.set()
+
+    def clear(self) -> None:
+        self.responses.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.responses.stats(), "in_flight": len(self._in_flight)}
+
+
+idempotency_store = IdempotencyStore(
+    maxsize=settings.IDEMPOTENCY_MAX_KEYS, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
@@ -0,0 +1,189 @@
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Collection, Iterator, List, Sequence, Tuple
+
+from schemas.expense import ExpenseImportError, ExpenseImportResult
+from services.expenses import insert_expenses
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Rows validated and inserted per transaction
+IMPORT_CHUNK_SIZE = 2000
+
+# Per-row errors kept in the response; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Amounts are Numeric(12, 2): at most 10 digits before the decimal point
+MAX_AMOUNT = Decimal("1e10")
+
+
+class ImportRowError(ValueError):
+    """A row of an import that cannot be turned into an expense."""
+
+
+class InvalidImportFile(ValueError):
+    """The upload as a whole cannot be imported (e.g. bad CSV header)."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a streamed UTF-8 body into lines without buffering the whole body.
+    A leading byte order mark (Excel's "CSV UTF-8") is dropped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_line_chunks(
+    chunks: AsyncIterator[bytes], size: int = IMPORT_CHUNK_SIZE
+) -> AsyncIterator[List[Tuple[int, str]]]:
+    """Group the non-blank lines of a body into lists of (line_number, line)."""
+    batch: List[Tuple[int, str]] = []
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_csv_records(
+    lines: List[Tuple[int, str]], header: List[str]
+) -> Iterator[Tuple[int, dict]]:
+    """Parse CSV lines (one record per line) into dicts keyed by the header."""
+    for line_number, line in lines:
+        [values] = csv.reader([line])
+        yield line_number, dict(zip(header, values))
+
+
+def parse_ndjson_records(lines: List[Tuple[int, str]]) -> Iterator[Tuple[int, object]]:
+    for line_number, line in lines:
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def validate_record(
+    record, member_ids: Collection[int], default_payer_id: int
+) -> dict:
+    """
+    Turn a raw record into insert_expenses() input or raise ImportRowError.
+    payer_id defaults to the importing user; date defaults to now (UTC).
+    """
+    if not isinstance(record, dict):
+        raise ImportRowError("Malformed row")
+
+    try:
+        amount = Decimal(str(record.get("amount") or "").strip())
+    except InvalidOperation:
+        raise ImportRowError("amount must be a number")
+    if not amount.is_finite() or amount <= 0:
+        raise ImportRowError("amount must be positive")
+    if amount >= MAX_AMOUNT:
+        raise ImportRowError("amount is too large")
+    if amount.as_tuple().exponent < -2:
+        raise ImportRowError("amount must have at most 2 decimals")
+
+    raw_date = record.get("date")
+    if raw_date:
+        try:
+            date = datetime.fromisoformat(str(raw_date).strip())
+        except ValueError:
+            raise ImportRowError("date must be an ISO 8601 date")
+        if date.tzinfo is None:
+            # Spreadsheets rarely carry an offset: read naive dates as UTC
+            date = date.replace(tzinfo=timezone.utc)
+    else:
+        date = datetime.now(timezone.utc)
+
+    raw_payer = record.get("payer_id")
+    if raw_payer in (None, ""):
+        payer_id = default_payer_id
+    else:
+        try:
+            payer_id = int(raw_payer)
+        except (TypeError, ValueError):
+            raise ImportRowError("payer_id must be an integer")
+    if payer_id not in member_ids:
+        raise ImportRowError("payer is not a member of this group")
+
+    return {
+        "payer_id": payer_id,
+        "amount": amount,
+        "description": str(record.get("description") or ""),
+        "date": date,
+    }
+
+
+async def import_expenses(
+    session: AsyncSession,
+    group_id: int,
+    member_ids: Sequence[int],
+    default_payer_id: int,
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+) -> ExpenseImportResult:
+    """
+    Import a streamed CSV/NDJSON upload into a group.
+
+    Lines are validated IMPORT_CHUNK_SIZE at a time and every chunk is inserted
+    with batched executemany statements in its own transaction, so memory use
+    is bounded and a bad row never rolls back the rows around it.
+    """
+    result = ExpenseImportResult()
+    members = set(member_ids)
+    header = None
+
+    def fail(line_number: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(ExpenseImportError(row=line_number, error=error))
+
+    async for lines in iter_line_chunks(chunks):
+        if import_format == "csv":
+            if header is None:
+                (_, header_line), lines = lines[0], lines[1:]
+                [header] = csv.reader([header_line])
+                header = [column.strip() for column in header]
+                if "amount" not in header:
+                    raise InvalidImportFile("CSV header must include an amount column")
+            records = parse_csv_records(lines, header)
+        else:
+            records = parse_ndjson_records(lines)
+
+        line_numbers, expenses = [], []
+        for line_number, record in records:
+            try:
+                expenses.append(validate_record(record, members, default_payer_id))
+                line_numbers.append(line_number)
+            except ImportRowError as exc:
+                fail(line_number, str(exc))
+        if not expenses:
+            continue
+
+        try:
+            await session.run_sync(insert_expenses, group_id, member_ids, expenses)
+            await session.commit()
+            result.imported += len(expenses)
+        except SQLAlchemyError:
+            await session.rollback()
+            for line_number in line_numbers:
+                fail(line_number, "Database error, row not imported")
+    return result
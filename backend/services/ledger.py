@@ -0,0 +1,129 @@
+from typing import Dict, List, Tuple
+
+from models.group import Group
+from models.group_balance import GroupBalance
+from models.group_member import GroupMember
+from services.group_version import bump_group_version
+from services.settlement import net_share_totals, open_share_totals
+from sqlalchemy import and_, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(session: Session, table):
+    """
+    Return a dialect specific INSERT construct supporting ON CONFLICT.
+    Both PostgreSQL and SQLite (>= 3.24) share the same upsert syntax.
+    """
+    dialect = session.get_bind().dialect.name
+    try:
+        return _UPSERT_DIALECTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f"Upsert is not supported on {dialect}")
+
+
+def apply_balance_deltas(
+    session: Session, group_id: int, deltas: Dict[int, int]
+) -> None:
+    """
+    Add per-user deltas (in cents) to the group's ledger in one statement.
+    Must be called inside the transaction that writes the expense/share rows
+    so the ledger never disagrees with them.
+    """
+    rows = [
+        {"group_id": group_id, "user_id": user_id, "net_cents": cents}
+        for user_id, cents in deltas.items()
+        if cents != 0
+    ]
+    if not rows:
+        return
+
+    statement = upsert_insert(session, GroupBalance.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["group_id", "user_id"],
+        set_={
+            "net_cents": GroupBalance.__table__.c.net_cents
+            + statement.excluded.net_cents
+        },
+    )
+    session.exec(statement, params=rows)
+
+
+def read_group_balances(session: Session, group_id: int) -> Dict[int, int]:
+    """Read the non-zero balances of a group from the ledger (O(members))."""
+    statement = select(GroupBalance.user_id, GroupBalance.net_cents).where(
+        GroupBalance.group_id == group_id,
+        GroupBalance.net_cents != 0,
+    )
+    return {user_id: cents for user_id, cents in session.exec(statement).all()}
+
+
+def read_user_balances(session: Session, user_id: int) -> List[Tuple[int, str, int]]:
+    """
+    The user's net position (in cents) in every group they belong to, as
+    (group_id, group_name, net_cents), from one query over the ledger.
+    Groups without a ledger row (nothing owed either way) report 0.
+    """
+    statement = (
+        select(Group.id, Group.name, func.coalesce(GroupBalance.net_cents, 0))
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .outerjoin(
+            GroupBalance,
+            and_(
+                GroupBalance.group_id == GroupMember.group_id,
+                GroupBalance.user_id == GroupMember.user_id,
+            ),
+        )
+        .where(GroupMember.user_id == user_id)
+        .order_by(Group.id)
+    )
+    return session.exec(statement).all()
+
+
+def reconcile_balances(
+    session: Session, apply: bool = True
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Rebuild the ledger from the expense/share tables.
+    Returns the drift found as (group_id, user_id, ledger_cents, expected_cents).
+    With apply=False the ledger is only compared, not rewritten.
+    """
+    totals = session.exec(open_share_totals()).all()
+    expected = {
+        key: cents for key, cents in net_share_totals(totals).items() if cents != 0
+    }
+    current = {
+        (group_id, user_id): cents
+        for group_id, user_id, cents in session.exec(
+            select(GroupBalance.group_id, GroupBalance.user_id, GroupBalance.net_cents)
+        ).all()
+        if cents != 0
+    }
+
+    drift = []
+    for group_id, user_id in sorted(expected.keys() | current.keys()):
+        ledger_cents = current.get((group_id, user_id), 0)
+        expected_cents = expected.get((group_id, user_id), 0)
+        if ledger_cents != expected_cents:
+            drift.append((group_id, user_id, ledger_cents, expected_cents))
+
+    if apply:
+        session.exec(delete(GroupBalance))
+        if expected:
+            session.exec(
+                GroupBalance.__table__.insert(),
+                params=[
+                    {"group_id": group_id, "user_id": user_id, "net_cents": cents}
+                    for (group_id, user_id), cents in expected.items()
+                ],
+            )
+        # Balances of these groups changed: invalidate their ETags
+        for group_id in sorted({group_id for group_id, _, _, _ in drift}):
+            session.exec(bump_group_version(group_id))
+        session.commit()
+    return drift
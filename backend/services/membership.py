@@ -0,0 +1,123 @@
+from bisect import bisect_left
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from core.cache import TTLCache
+from core.config import settings
+from models.group import Group
+from models.group_member import GroupMember
+from services.group_version import read_group_version
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class GroupMembers(NamedTuple):
+    """Members of a group: sorted user ids plus each member's role."""
+
+    member_ids: Tuple[int, ...]
+    roles: Dict[int, str]
+    # Group.version the members were read at, when known
+    version: Optional[int] = None
+
+    def is_member(self, user_id: int) -> bool:
+        i = bisect_left(self.member_ids, user_id)
+        return i < len(self.member_ids) and self.member_ids[i] == user_id
+
+
+# group_id -> GroupMembers. Answers both "is this user a member?" and "who do
+# we split with?" from one lookup. Writes through the ORM invalidate entries;
+# the TTL bounds staleness for changes made elsewhere (raw SQL, other workers),
+# except for writes, which check entries against the group's version first.
+membership_cache = TTLCache(
+    maxsize=settings.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+_PENDING_KEY = "invalidated_group_ids"
+
+
+async def get_group_members(session: AsyncSession, group_id: int) -> GroupMembers:
+    """
+    Return the members of a group, from the cache when possible.
+    A group without members (or that does not exist) yields an empty record.
+    """
+    members = membership_cache.get(group_id)
+    if members is not None:
+        return members
+    return await _load_group_members(session, group_id)
+
+
+async def get_current_group_members(
+    session: AsyncSession, group_id: int
+) -> GroupMembers:
+    """
+    Like get_group_members, for writes that split between the members: the
+    cached entry is only used if the group's version has not moved since it
+    was read, so members added by another worker (or outside the ORM) are
+    seen before the TTL runs out. Costs one indexed lookup on a cache hit.
+    """
+    version = await read_group_version(session, group_id)
+    members = membership_cache.get(group_id)
+    if members is not None and version is not None and members.version == version:
+        return members
+    return await _load_group_members(session, group_id)
+
+
+def advance_group_members(group_id: int, members: GroupMembers) -> None:
+    """
+    After committing a write that bumped the group's version once without
+    changing its members, keep the cached entry valid for the next write.
+    If another writer bumped the version in between, the entry stays behind
+    the group's version and is reloaded.
+    """
+    if members.version is not None:
+        membership_cache.replace(
+            group_id, members, members._replace(version=members.version + 1)
+        )
+
+
+async def _load_group_members(session: AsyncSession, group_id: int) -> GroupMembers:
+    # The members and the version they are at, from one statement
+    rows = (
+        await session.exec(
+            select(Group.version, GroupMember.user_id, GroupMember.role)
+            .select_from(Group)
+            .outerjoin(GroupMember, GroupMember.group_id == Group.id)
+            .where(Group.id == group_id)
+            .order_by(GroupMember.user_id)
+        )
+    ).all()
+    pairs = [(user_id, role) for _, user_id, role in rows if user_id is not None]
+    members = GroupMembers(
+        member_ids=tuple(user_id for user_id, _ in pairs),
+        roles=dict(pairs),
+        version=rows[0][0] if rows else None,
+    )
+    # A replica may lag behind a membership change: only cache primary reads
+    if not session.info.get("replica"):
+        membership_cache.set(group_id, members)
+    return members
+
+
+def invalidate_group_members(group_id: int) -> None:
+    membership_cache.invalidate(group_id)
+
+
+@event.listens_for(GroupMember, "after_insert")
+@event.listens_for(GroupMember, "after_update")
+@event.listens_for(GroupMember, "after_delete")
+def _invalidate_on_write(mapper, connection, target: GroupMember) -> None:
+    invalidate_group_members(target.group_id)
+    # Invalidate again after commit: a concurrent request may have cached the
+    # old member list between this flush and the commit.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.group_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for group_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_group_members(group_id)
+
@@ -0,0 +1,147 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models.archive import ArchivedExpense, ArchivedExpenseShare
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.monthly_spend import GroupMonthlySpend
+from services.ledger import upsert_insert
+from sqlalchemy import Integer, cast, delete, func, insert
+from sqlmodel import Session, select
+
+# (month, user_id) -> [paid_cents, owed_cents]
+SpendDeltas = Dict[Tuple[str, int], List[int]]
+
+
+def month_of(date: datetime) -> str:
+    """The rollup month of an expense date, as stored ("YYYY-MM")."""
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+def month_expression(session: Session, column):
+    """SQL equivalent of month_of() for the bound database."""
+    if session.get_bind().dialect.name == "postgresql":
+        # timestamptz: take the UTC month, whatever the session time zone
+        return func.to_char(func.timezone("UTC", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def apply_spend_deltas(session: Session, group_id: int, deltas: SpendDeltas) -> None:
+    """
+    Add paid/owed cents to the group's monthly rollup in one upsert. Like
+    apply_balance_deltas, call it in the transaction writing the expenses.
+    """
+    rows = [
+        {
+            "group_id": group_id,
+            "month": month,
+            "user_id": user_id,
+            "paid_cents": paid_cents,
+            "owed_cents": owed_cents,
+        }
+        for (month, user_id), (paid_cents, owed_cents) in deltas.items()
+        if paid_cents or owed_cents
+    ]
+    if not rows:
+        return
+
+    table = GroupMonthlySpend.__table__
+    statement = upsert_insert(session, table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["group_id", "month", "user_id"],
+        set_={
+            "paid_cents": table.c.paid_cents + statement.excluded.paid_cents,
+            "owed_cents": table.c.owed_cents + statement.excluded.owed_cents,
+        },
+    )
+    session.exec(statement, params=rows)
+
+
+def _sum_cents(column):
+    return func.sum(cast(func.round(column * 100), Integer))
+
+
+def rebuild_monthly_spend(session: Session, batch_size: int = 10_000) -> int:
+    """
+    Recompute the whole rollup from the expense tables, archived ones
+    included, with two aggregate queries per table pair (paid per payer,
+    owed per share) and replace it. Returns the number of rollup rows.
+    Commits.
+    """
+    totals: Dict[Tuple[int, str, int], List[int]] = {}
+    for expense, share in ((Expense, ExpenseShare), (ArchivedExpense, ArchivedExpenseShare)):
+        month = month_expression(session, expense.date)
+        paid = (
+            select(expense.group_id, month, expense.payer_id, _sum_cents(expense.amount))
+            .group_by(expense.group_id, month, expense.payer_id)
+        )
+        for group_id, expense_month, user_id, paid_cents in session.exec(paid):
+            totals.setdefault((group_id, expense_month, user_id), [0, 0])[0] += paid_cents
+        owed = (
+            select(expense.group_id, month, share.user_id, _sum_cents(share.amount))
+            .join(expense, expense.id == share.expense_id)
+            .group_by(expense.group_id, month, share.user_id)
+        )
+        for group_id, expense_month, user_id, owed_cents in session.exec(owed):
+            totals.setdefault((group_id, expense_month, user_id), [0, 0])[1] += owed_cents
+
+    session.exec(delete(GroupMonthlySpend))
+    rows = [
+        {
+            "group_id": group_id,
+            "month": expense_month,
+            "user_id": user_id,
+            "paid_cents": paid_cents,
+            "owed_cents": owed_cents,
+        }
+        for (group_id, expense_month, user_id), (paid_cents, owed_cents) in totals.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        session.exec(insert(GroupMonthlySpend.__table__), params=rows[start : start + batch_size])
+    session.commit()
+    return len(rows)
+
+
+def read_monthly_spend(
+    session: Session, group_id: int, start: Optional[str] = None, end: Optional[str] = None
+) -> List[Tuple[str, int, int, int]]:
+    """
+    (month, user_id, paid_cents, owed_cents) of a group between two months
+    (inclusive), in month order. Reads the rollup only.
+    """
+    statement = (
+        select(
+            GroupMonthlySpend.month,
+            GroupMonthlySpend.user_id,
+            GroupMonthlySpend.paid_cents,
+            GroupMonthlySpend.owed_cents,
+        )
+        .where(GroupMonthlySpend.group_id == group_id)
+        .order_by(GroupMonthlySpend.month, GroupMonthlySpend.user_id)
+    )
+    if start is not None:
+        statement = statement.where(GroupMonthlySpend.month >= start)
+    if end is not None:
+        statement = statement.where(GroupMonthlySpend.month <= end)
+    return session.exec(statement).all()
+
+
+def read_top_payers(
+    session: Session, group_id: int, month: str, limit: int
+) -> List[Tuple[int, int, int]]:
+    """(user_id, paid_cents, owed_cents) of a month's biggest payers."""
+    statement = (
+        select(
+            GroupMonthlySpend.user_id,
+            GroupMonthlySpend.paid_cents,
+            GroupMonthlySpend.owed_cents,
+        )
+        .where(
+            GroupMonthlySpend.group_id == group_id,
+            GroupMonthlySpend.month == month,
+            GroupMonthlySpend.paid_cents > 0,
+        )
+        .order_by(GroupMonthlySpend.paid_cents.desc(), GroupMonthlySpend.user_id)
+        .limit(limit)
+    )
+    return session.exec(statement).all()
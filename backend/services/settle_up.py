@@ -0,0 +1,103 @@
+from decimal import Decimal
+from typing import Optional
+
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.group_balance import GroupBalance
+from models.settlement import Settlement
+from services.group_version import bump_group_version
+from services.ledger import apply_balance_deltas
+from services.settlement import from_cents, to_cents
+from sqlalchemy import Integer, cast, func, update
+from sqlmodel import Session, select
+
+
+class NothingToSettle(ValueError):
+    """Raised when no open share of the debtor to the creditor can be settled."""
+
+
+def lock_balances(session: Session, group_id: int, *user_ids: int) -> None:
+    """
+    Lock the ledger rows of the given users (FOR UPDATE, in user id order to
+    avoid deadlocks) so concurrent settlements of the same pair serialize.
+    Only PostgreSQL needs it: SQLite already serializes writers.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    session.exec(
+        select(GroupBalance.user_id)
+        .where(GroupBalance.group_id == group_id, GroupBalance.user_id.in_(user_ids))
+        .order_by(GroupBalance.user_id)
+        .with_for_update()
+    ).all()
+
+
+def settle_shares(
+    session: Session,
+    group_id: int,
+    debtor_id: int,
+    creditor_id: int,
+    amount: Optional[Decimal] = None,
+) -> Settlement:
+    """
+    Mark the debtor's unpaid shares of expenses paid by the creditor as paid,
+    oldest first. With `amount`, only the oldest shares whose running total
+    fits in it are settled (shares are never split). Records a Settlement and
+    moves the ledger, in the caller's transaction. The caller commits.
+
+    One set-based UPDATE whatever the number of open shares: the running
+    total is a window function over the candidate shares.
+    """
+    lock_balances(session, group_id, debtor_id, creditor_id)
+
+    # Cents as integers so the running total is exact on every backend
+    share_cents = cast(func.round(ExpenseShare.amount * 100), Integer)
+    open_shares = (
+        select(
+            ExpenseShare.id,
+            func.sum(share_cents)
+            .over(order_by=(Expense.date, Expense.id))
+            .label("running_cents"),
+        )
+        .join(Expense, Expense.id == ExpenseShare.expense_id)
+        .where(
+            Expense.group_id == group_id,
+            Expense.payer_id == creditor_id,
+            ExpenseShare.user_id == debtor_id,
+            ExpenseShare.is_paid == False,  # noqa: E712
+        )
+        .subquery()
+    )
+    settled_ids = select(open_shares.c.id)
+    if amount is not None:
+        settled_ids = settled_ids.where(open_shares.c.running_cents <= to_cents(amount))
+
+    statement = (
+        update(ExpenseShare)
+        .where(
+            ExpenseShare.id.in_(settled_ids),
+            # Re-checked on PostgreSQL if a concurrent transaction got there first
+            ExpenseShare.is_paid == False,  # noqa: E712
+        )
+        .values(is_paid=True)
+        .returning(ExpenseShare.amount)
+    )
+    settled = [to_cents(share_amount) for share_amount in session.exec(statement).scalars()]
+    if not settled:
+        raise NothingToSettle()
+
+    cents = sum(settled)
+    # The debtor owes less, the creditor is owed less
+    apply_balance_deltas(session, group_id, {debtor_id: cents, creditor_id: -cents})
+    session.exec(bump_group_version(group_id))
+
+    settlement = Settlement(
+        group_id=group_id,
+        debtor_id=debtor_id,
+        creditor_id=creditor_id,
+        amount=from_cents(cents),
+        shares_settled=len(settled),
+    )
+    session.add(settlement)
+    session.flush()
+    return settlement
@@ -0,0 +1,96 @@
+import heapq
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Tuple
+
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+
+def to_cents(amount) -> int:
+    """Convert a money value (Decimal, float or str) to integer cents."""
+    return int(
+        (Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    )
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a 2-decimal Decimal."""
+    return (Decimal(cents) / 100).quantize(Decimal("0.01"))
+
+
+def open_share_totals():
+    """
+    Aggregate of every unpaid share, grouped by (group, debtor, creditor).
+    The payer's own share is excluded since nobody owes it to anyone.
+    """
+    return (
+        select(
+            Expense.group_id,
+            ExpenseShare.user_id,
+            Expense.payer_id,
+            func.sum(ExpenseShare.amount),
+        )
+        .join(Expense, Expense.id == ExpenseShare.expense_id)
+        .where(
+            ExpenseShare.is_paid == False,  # noqa: E712
+            ExpenseShare.user_id != Expense.payer_id,
+        )
+        .group_by(Expense.group_id, ExpenseShare.user_id, Expense.payer_id)
+    )
+
+
+def net_share_totals(rows) -> Dict[Tuple[int, int], int]:
+    """Net the rows of open_share_totals() into {(group_id, user_id): cents}."""
+    balances: Dict[Tuple[int, int], int] = {}
+    for group_id, debtor_id, creditor_id, total in rows:
+        cents = to_cents(total)
+        balances[(group_id, debtor_id)] = balances.get((group_id, debtor_id), 0) - cents
+        balances[(group_id, creditor_id)] = (
+            balances.get((group_id, creditor_id), 0) + cents
+        )
+    return balances
+
+
+def compute_group_balances(session: Session, group_id: int) -> Dict[int, int]:
+    """
+    Net every unpaid share of a group into per-user balances (in cents).
+    Positive = the user should receive money, negative = the user owes money.
+
+    Runs a single aggregate query so the cost on the Python side depends on
+    the number of member pairs, not on the number of expenses.
+    """
+    statement = open_share_totals().where(Expense.group_id == group_id)
+    rows = session.exec(statement).all()
+    return {
+        user_id: cents for (_, user_id), cents in net_share_totals(rows).items()
+    }
+
+
+def simplify_debts(balances: Dict[int, int]) -> List[Tuple[int, int, int]]:
+    """
+    Turn net balances into a small set of transfers (debtor, creditor, cents).
+
+    Greedy: repeatedly match the largest creditor with the largest debtor.
+    Each step settles at least one of them, so there are at most n - 1
+    transfers and the whole thing is O(n log n) thanks to the heaps.
+    """
+    # heapq is a min-heap, so store negated amounts to pop the largest first
+    creditors = [(-cents, user_id) for user_id, cents in balances.items() if cents > 0]
+    debtors = [(cents, user_id) for user_id, cents in balances.items() if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers: List[Tuple[int, int, int]] = []
+    while creditors and debtors:
+        credit, creditor_id = heapq.heappop(creditors)
+        debt, debtor_id = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor_id, creditor_id, amount))
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor_id))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor_id))
+    return transfers
@@ -0,0 +1,77 @@
+"""
+Settlement plans (balances + minimal transfers) of groups, computed in the
+background after every write instead of on the first read that follows it.
+
+Plans are cached per group with the group version they were computed at, so
+a plan is only served for the exact version a request reads: a stale plan is
+never returned, whatever the order jobs and requests run in. When no plan is
+ready (worker busy, job failed, another process wrote), the request computes
+it itself.
+"""
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from core.cache import TTLCache
+from core.config import settings
+from core.jobs import job_worker
+from db.session import async_session
+from services.group_version import read_group_version
+from services.ledger import read_group_balances
+from services.settlement import simplify_debts
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class SettlementPlan(NamedTuple):
+    version: int
+    # user_id -> net cents
+    balances: Dict[int, int]
+    # (debtor_id, creditor_id, cents)
+    transfers: List[Tuple[int, int, int]]
+
+
+# group_id -> latest SettlementPlan computed
+settlement_plans = TTLCache(
+    maxsize=settings.SETTLEMENT_PLAN_CACHE_MAX_SIZE,
+    ttl=settings.SETTLEMENT_PLAN_CACHE_TTL_SECONDS,
+)
+
+
+def cached_settlement_plan(group_id: int, version: int) -> Optional[SettlementPlan]:
+    plan = settlement_plans.get(group_id)
+    if plan is not None and plan.version == version:
+        return plan
+    return None
+
+
+async def get_settlement_plan(
+    session: AsyncSession, group_id: int, version: int
+) -> SettlementPlan:
+    """The group's plan at `version`, from the cache or computed (and cached)."""
+    plan = cached_settlement_plan(group_id, version)
+    if plan is not None:
+        return plan
+
+    balances = await session.run_sync(read_group_balances, group_id)
+    plan = SettlementPlan(version, balances, simplify_debts(balances))
+    # A lagging replica must not replace a newer plan
+    cached = settlement_plans.get(group_id)
+    if cached is None or cached.version < version:
+        settlement_plans.set(group_id, plan)
+    return plan
+
+
+async def precompute_settlement_plan(group_id: int) -> None:
+    async with async_session() as session:
+        version = await read_group_version(session, group_id)
+        if version is not None:
+            await get_settlement_plan(session, group_id, version)
+
+
+def schedule_settlement_plan(group_id: int) -> bool:
+    """
+    Queue the recompute of a group's plan; call after the write commits.
+    Writes in quick succession coalesce into one recompute.
+    """
+    return job_worker.submit(
+        ("settlement_plan", group_id), partial(precompute_settlement_plan, group_id)
+    )
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from core.cache import TTLCache
+from core.config import settings
+from models.user import User
+from schemas.user import UserPublic
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# Slim, read-only user records keyed by user id, used to authenticate requests
+# without a database round trip. Entries expire after USER_CACHE_TTL_SECONDS so
+# changes made outside the ORM (raw SQL, other workers) are picked up eventually.
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+_PENDING_KEY = "invalidated_user_ids"
+
+
+def get_cached_user(user_id: int) -> Optional[UserPublic]:
+    return user_cache.get(user_id)
+
+
+def cache_user(user: User) -> UserPublic:
+    record = UserPublic.model_validate(user)
+    user_cache.set(user.id, record)
+    return record
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the cache, e.g. after deactivation or a profile update."""
+    user_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+    # Invalidate again after commit: a concurrent request may have cached the
+    # old row between this flush and the commit.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(user_id)
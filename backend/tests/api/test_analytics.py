@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from core.config import settings
+from models.monthly_spend import GroupMonthlySpend
+from services.rollups import rebuild_monthly_spend
+from sqlmodel import Session, select
+
+API = settings.API_V1_STR
+
+
+def _rollup(session: Session):
+    session.expire_all()
+    return sorted(
+        (row.group_id, row.month, row.user_id, row.paid_cents, row.owed_cents)
+        for row in session.exec(select(GroupMonthlySpend)).all()
+    )
+
+
+# Two months of history, one expense this month
+STATS_ROWS = [
+    "40,Pho,2025-01-10T12:00:00,1",
+    "20,Coffee,2025-01-20T12:00:00,2",
+    "30,Bun cha,2025-02-03T12:00:00,2",
+    "10,Banh mi,,2",
+]
+
+
+def test_monthly_spend(client: TestClient, normal_user_token_headers, seed_group):
+    group_id, _ = seed_group("Stats Group", "alice", STATS_ROWS)
+
+    response = client.get(
+        f"{API}/groups/{group_id}/analytics/monthly",
+        headers=normal_user_token_headers,
+        params={"start": "2025-01", "end": "2025-02"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "group_id": group_id,
+        "months": [
+            {
+                "month": "2025-01",
+                "total": "60.00",
+                "members": [
+                    {"user_id": 1, "paid": "40.00", "owed": "30.00"},
+                    {"user_id": 2, "paid": "20.00", "owed": "30.00"},
+                ],
+            },
+            {
+                "month": "2025-02",
+                "total": "30.00",
+                "members": [
+                    {"user_id": 1, "paid": "0.00", "owed": "15.00"},
+                    {"user_id": 2, "paid": "30.00", "owed": "15.00"},
+                ],
+            },
+        ],
+    }
+
+    response = client.get(
+        f"{API}/groups/{group_id}/analytics/monthly",
+        headers=normal_user_token_headers,
+        params={"start": "2025-13"},
+    )
+    assert response.status_code == 422
+
+
+def test_top_payers(client: TestClient, normal_user_token_headers, seed_group):
+    group_id, _ = seed_group("Stats Group", "alice", STATS_ROWS)
+
+    response = client.get(
+        f"{API}/groups/{group_id}/analytics/top-payers",
+        headers=normal_user_token_headers,
+        params={"month": "2025-01"},
+    )
+    assert [payer["user_id"] for payer in response.json()["payers"]] == [1, 2]
+
+    # Defaults to the current month
+    response = client.get(
+        f"{API}/groups/{group_id}/analytics/top-payers", headers=normal_user_token_headers
+    )
+    data = response.json()
+    assert data["month"] == datetime.now(timezone.utc).strftime("%Y-%m")
+    assert data["payers"] == [{"user_id": 2, "paid": "10.00", "owed": "5.00"}]
+
+
+def test_rebuild_matches_incremental_rollup(
+    client: TestClient, session: Session, seed_group
+):
+    seed_group("Stats Group", "alice", STATS_ROWS)
+    maintained = _rollup(session)
+    assert maintained
+
+    assert rebuild_monthly_spend(session) == len(maintained)
+    assert _rollup(session) == maintained
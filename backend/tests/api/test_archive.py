@@ -0,0 +1,111 @@
+import csv
+import io
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from core.config import settings
+from models.archive import ArchivedExpense, ArchivedExpenseShare
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from services.archive import archive_settled_expenses
+from services.ledger import reconcile_balances
+from services.rollups import rebuild_monthly_spend
+from sqlmodel import Session, select
+
+API = settings.API_V1_STR
+
+
+@pytest.fixture(name="archive_group")
+def archive_group_fixture(client: TestClient, seed_group) -> int:
+    """
+    Three old expenses split with bob, the first two settled, and one recent
+    settled expense: only the first two are archivable.
+    """
+    group_id, bob_headers = seed_group(
+        "Archive Group",
+        "bob",
+        [
+            "20,Pho,2024-01-10T12:00:00,1",
+            "40,Bun cha,2024-02-10T12:00:00,1",
+            "60,Com tam,2024-03-10T12:00:00,1",
+            "10,Banh mi,,1",
+        ],
+    )
+    # Oldest shares first: 10 + 20 settles Pho and Bun cha, then Banh mi
+    resp = client.post(
+        f"{API}/groups/{group_id}/settle",
+        headers=bob_headers,
+        json={"debtor_id": 2, "creditor_id": 1, "amount": "30"},
+    )
+    assert resp.json()["shares_settled"] == 2
+    return group_id
+
+
+def _descriptions(client: TestClient, headers, group_id: int, **params):
+    page = client.get(f"{API}/groups/{group_id}/expenses", headers=headers, params=params).json()
+    return [item["description"] for item in page["items"]], page["next_cursor"]
+
+
+def test_archive_settled_expenses(session: Session, archive_group):
+    rollup_before = rebuild_monthly_spend(session)
+
+    assert archive_settled_expenses(session, timedelta(days=180), batch_size=1) == 2
+    # Nothing left to move
+    assert archive_settled_expenses(session, timedelta(days=180), batch_size=1) == 0
+
+    session.expire_all()
+    assert sorted(e.description for e in session.exec(select(Expense)).all()) == ["Banh mi", "Com tam"]
+    archived = session.exec(select(ArchivedExpense).order_by(ArchivedExpense.id)).all()
+    assert [(e.id, e.description) for e in archived] == [(1, "Pho"), (2, "Bun cha")]
+    assert len(session.exec(select(ArchivedExpenseShare)).all()) == 4
+    assert all(share.is_paid for share in session.exec(select(ArchivedExpenseShare)).all())
+    assert session.exec(select(ExpenseShare).where(ExpenseShare.expense_id.in_([1, 2]))).all() == []
+
+    # Balances only ever counted open shares; the rollup counts the archive too
+    assert reconcile_balances(session, apply=False) == []
+    assert rebuild_monthly_spend(session) == rollup_before
+
+
+def test_history_with_archived_expenses(
+    client: TestClient, session: Session, normal_user_token_headers, archive_group
+):
+    group_id = archive_group
+    archive_settled_expenses(session, timedelta(days=180), batch_size=100)
+    headers = normal_user_token_headers
+
+    assert _descriptions(client, headers, group_id)[0] == ["Banh mi", "Com tam"]
+
+    # Pages run across both tables with the same cursor
+    items, cursor = _descriptions(client, headers, group_id, include_archived=True, limit=3)
+    assert items == ["Banh mi", "Com tam", "Bun cha"]
+    items, cursor = _descriptions(
+        client, headers, group_id, include_archived=True, limit=3, cursor=cursor
+    )
+    assert (items, cursor) == (["Pho"], None)
+
+    page = client.get(
+        f"{API}/groups/{group_id}/expenses",
+        headers=headers,
+        params={"include_archived": True, "payer_id": 1, "end": "2024-02-01T00:00:00Z"},
+    ).json()
+    assert [item["description"] for item in page["items"]] == ["Pho"]
+    assert [(s["user_id"], s["is_paid"]) for s in page["items"][0]["shares"]] == [(1, True), (2, True)]
+
+
+def test_export_with_archived_expenses(
+    client: TestClient, session: Session, normal_user_token_headers, archive_group
+):
+    group_id = archive_group
+    archive_settled_expenses(session, timedelta(days=180), batch_size=100)
+
+    def export(**params):
+        resp = client.get(f"{API}/groups/{group_id}/export", headers=normal_user_token_headers, params=params)
+        assert resp.status_code == 200
+        return list(csv.DictReader(io.StringIO(resp.text)))
+
+    assert {row["description"] for row in export()} == {"Com tam", "Banh mi"}
+    rows = export(include_archived=True)
+    # Oldest first, two shares per expense
+    assert [row["description"] for row in rows[::2]] == ["Pho", "Bun cha", "Com tam", "Banh mi"]
+    assert rows[0]["payer_name"] == "Test User"
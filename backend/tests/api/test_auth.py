@@ -1,7 +1,9 @@
 from fastapi.testclient import TestClient
+from core import security
 from core.config import settings
 from sqlmodel import Session, select
 from models.user import User
+from services.user_cache import user_cache
 
 def test_signup_new_user(client: TestClient, session: Session):
     response = client.post(
@@ -63,3 +65,65 @@ def test_read_users_me(client: TestClient, normal_user_token_headers):
     )
     assert response.status_code == 200
     assert response.json()["email"] == "test@example.com"
+
+def test_current_user_is_cached(client: TestClient, normal_user_token_headers):
+    user_cache.clear()
+    for _ in range(3):
+        response = client.get(
+            f"{settings.API_V1_STR}/auth/me",
+            headers=normal_user_token_headers
+        )
+        assert response.status_code == 200
+
+    stats = user_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+def test_deactivated_user_is_invalidated(client: TestClient, session: Session, normal_user_token_headers):
+    response = client.get(
+        f"{settings.API_V1_STR}/auth/me",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+
+    # Deactivate through the ORM: the cached record must be dropped on commit
+    user = session.exec(select(User).where(User.email == "test@example.com")).first()
+    user.is_active = False
+    session.add(user)
+    session.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/auth/me",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+def test_login_rehashes_password_with_new_cost(client: TestClient, session: Session):
+    # A user whose hash was made with a cheaper bcrypt cost than configured
+    user = User(
+        email="legacy@example.com",
+        username="legacy",
+        first_name="Legacy",
+        last_name="User",
+        hashed_password=security.build_crypt_context(4).hash("password123"),
+    )
+    session.add(user)
+    session.commit()
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "legacy@example.com", "password": "password123"}
+    )
+    assert response.status_code == 200
+
+    session.refresh(user)
+    assert not security.pwd_context.needs_update(user.hashed_password)
+    assert security.verify_password("password123", user.hashed_password)
+
+def test_login_returns_503_when_hasher_saturated(client: TestClient, normal_user_token_headers, monkeypatch):
+    monkeypatch.setattr(security.password_hasher, "max_pending", 0)
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "test@example.com", "password": "testpassword123"}
+    )
+    assert response.status_code == 503
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from core.config import settings
+from core.pubsub import broker
+from services.group_events import group_channel
+
+API = settings.API_V1_STR
+
+
+def _parse_events(body: str):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], lines["data"]))
+    return events
+
+
+def test_group_events_stream(client: TestClient, normal_user_token_headers, signup_and_login):
+    group_id = client.post(
+        f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Live Group"}
+    ).json()["id"]
+    token = normal_user_token_headers["Authorization"].split(" ", 1)[1]
+
+    # The TestClient only returns a streamed body once it ends: read it in a
+    # thread and end it with broker.close()
+    result = {}
+
+    def listen():
+        result["response"] = client.get(f"{API}/groups/{group_id}/events", params={"token": token})
+
+    listener = threading.Thread(target=listen)
+    listener.start()
+    deadline = time.monotonic() + 5
+    while not broker.subscriber_count(group_channel(group_id)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    client.post(f"{API}/groups/{group_id}/join", headers=signup_and_login("alice"))
+    client.post(
+        f"{API}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 30, "description": "Pho", "group_id": group_id},
+    )
+    client.post(
+        f"{API}/groups/{group_id}/settle",
+        headers=normal_user_token_headers,
+        json={"debtor_id": 2, "creditor_id": 1},
+    )
+    # Another group's events are not delivered
+    other_id = client.post(
+        f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Other"}
+    ).json()["id"]
+    client.post(
+        f"{API}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 10, "description": "Coffee", "group_id": other_id},
+    )
+
+    broker.close()
+    listener.join(5)
+    assert not listener.is_alive()
+
+    response = result["response"]
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith(": connected\n\n")
+    events = _parse_events(response.text)
+    assert [event_type for event_type, _ in events] == [
+        "member.joined",
+        "expense.created",
+        "settlement.created",
+    ]
+    assert '"user_id":2' in events[0][1]
+    assert '"description":"Pho"' in events[1][1]
+    assert '"amount":"15.00"' in events[2][1]
+    assert broker.subscriber_count() == 0
+
+
+def test_group_events_require_membership(client: TestClient, normal_user_token_headers, signup_and_login):
+    group_id = client.post(
+        f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Private"}
+    ).json()["id"]
+
+    assert client.get(f"{API}/groups/{group_id}/events").status_code == 401
+
+    bob_headers = signup_and_login("bob")
+    bob_token = bob_headers["Authorization"].split(" ", 1)[1]
+    response = client.get(f"{API}/groups/{group_id}/events", params={"token": bob_token})
+    assert response.status_code == 403
+    response = client.get(
+        f"{API}/groups/{group_id}/events", headers=bob_headers
+    )
+    assert response.status_code == 403
@@ -1,6 +1,19 @@
+import asyncio
+import csv
+import io
+import json
 from decimal import Decimal
+
+import httpx
 from fastapi.testclient import TestClient
 from core.config import settings
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.group_member import GroupMember
+from services.group_version import bump_group_version
+from services.membership import membership_cache
+from sqlalchemy import insert
+from sqlmodel import Session, select
 
 def test_create_expense_split(client: TestClient, normal_user_token_headers):
     # 1. Create a group
@@ -83,3 +96,239 @@ def test_create_expense_split(client: TestClient, normal_user_token_headers):
         json=expense_data
     )
     assert resp.status_code == 403
+
+def test_list_group_expenses_keyset_pagination(client: TestClient, normal_user_token_headers):
+    group_resp = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "History Group"}
+    )
+    group_id = group_resp.json()["id"]
+
+    created_ids = []
+    for i in range(5):
+        resp = client.post(
+            f"{settings.API_V1_STR}/expenses/",
+            headers=normal_user_token_headers,
+            json={"amount": 10 + i, "description": f"Lunch {i}", "group_id": group_id}
+        )
+        created_ids.append(resp.json()["id"])
+
+    # Walk every page of 2 items
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get(
+            f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+            headers=normal_user_token_headers,
+            params=params
+        )
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page["items"]) <= 2
+        for item in page["items"]:
+            assert len(item["shares"]) == 1
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, no duplicates, nothing missing
+    assert seen == list(reversed(created_ids))
+
+    # Payer filter
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers,
+        params={"payer_id": 999999}
+    )
+    assert resp.json() == {"items": [], "next_cursor": None}
+
+    # Garbage cursor
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers,
+        params={"cursor": "not-a-cursor"}
+    )
+    assert resp.status_code == 400
+
+def test_create_expense_persists_shares(client: TestClient, session: Session, normal_user_token_headers):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Persisted Group"}
+    ).json()["id"]
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 12.5, "description": "Xoi", "group_id": group_id}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+
+    # The response is built from the inserted values: it must match the DB
+    expense = session.get(Expense, data["id"])
+    assert expense.payer_id == data["payer_id"]
+    shares = session.exec(select(ExpenseShare).where(ExpenseShare.expense_id == expense.id)).all()
+    assert [(s.user_id, float(s.amount), s.is_paid) for s in shares] == [
+        (share["user_id"], float(share["amount"]), share["is_paid"]) for share in data["shares"]
+    ]
+
+
+def test_create_expense_sees_members_added_by_another_worker(
+    client: TestClient, session: Session, normal_user_token_headers, signup_and_login
+):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Other Worker Group"}
+    ).json()["id"]
+    client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 10, "description": "Tra da", "group_id": group_id}
+    )
+    assert membership_cache.get(group_id).member_ids == (1,)
+
+    # Another worker handles a join: this worker's cache still has one member
+    bob_headers = signup_and_login("bob")
+    bob_id = client.get(f"{settings.API_V1_STR}/auth/me", headers=bob_headers).json()["id"]
+    session.exec(insert(GroupMember.__table__).values(group_id=group_id, user_id=bob_id, role="member"))
+    session.exec(bump_group_version(group_id))
+    session.commit()
+    assert membership_cache.get(group_id).member_ids == (1,)
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=bob_headers,
+        json={"amount": 30, "description": "Bun rieu", "group_id": group_id}
+    )
+    assert resp.status_code == 200
+    shares = session.exec(
+        select(ExpenseShare).where(ExpenseShare.expense_id == resp.json()["id"])
+    ).all()
+    assert sorted((s.user_id, float(s.amount)) for s in shares) == [(1, 15.0), (bob_id, 15.0)]
+
+def test_export_group_ledger(client: TestClient, normal_user_token_headers):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Export Group"}
+    ).json()["id"]
+    for amount in (10, 20):
+        client.post(
+            f"{settings.API_V1_STR}/expenses/",
+            headers=normal_user_token_headers,
+            json={"amount": amount, "description": "Com tam", "group_id": group_id}
+        )
+
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/export",
+        headers=normal_user_token_headers
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [float(row["expense_amount"]) for row in rows] == [10.0, 20.0]
+    assert rows[0]["payer_name"] == "Test User"
+
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/export",
+        headers=normal_user_token_headers,
+        params={"format": "ndjson"}
+    )
+    assert resp.status_code == 200
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(records) == 2
+    assert records[1]["share_amount"] == "20.00"
+    assert records[1]["is_paid"] is True
+
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/export",
+        headers=normal_user_token_headers,
+        params={"format": "xml"}
+    )
+    assert resp.status_code == 422
+
+
+def _expense_count(session: Session) -> int:
+    return len(session.exec(select(Expense.id)).all())
+
+
+def test_idempotency_key_replays_first_response(
+    client: TestClient, session: Session, query_budget, normal_user_token_headers
+):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Retry Group"}
+    ).json()["id"]
+    headers = {**normal_user_token_headers, "Idempotency-Key": "lunch-1"}
+    body = {"amount": 45, "description": "Bun cha", "group_id": group_id}
+
+    first = client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=body)
+    assert first.status_code == 200
+    # The retry touches no table at all
+    with query_budget(0):
+        retry = client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=body)
+    assert retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _expense_count(session) == 1
+
+    # Same key, different request
+    response = client.post(
+        f"{settings.API_V1_STR}/expenses/", headers=headers, json={**body, "amount": 50}
+    )
+    assert response.status_code == 422
+
+    # Keys are per user and requests without one are never deduplicated
+    client.post(f"{settings.API_V1_STR}/expenses/", headers=normal_user_token_headers, json=body)
+    assert _expense_count(session) == 2
+
+
+def test_idempotency_key_failed_request_is_not_stored(
+    client: TestClient, session: Session, normal_user_token_headers
+):
+    headers = {**normal_user_token_headers, "Idempotency-Key": "lunch-2"}
+    body = {"amount": 45, "description": "Bun cha", "group_id": 1}
+
+    response = client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=body)
+    assert response.status_code == 403
+    client.post(f"{settings.API_V1_STR}/groups/", headers=normal_user_token_headers, json={"name": "Late Group"})
+    response = client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=body)
+    assert response.status_code == 200
+    assert _expense_count(session) == 1
+
+
+def test_concurrent_duplicates_wait_for_the_first(
+    client: TestClient, session: Session, normal_user_token_headers
+):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Concurrent Group"}
+    ).json()["id"]
+    headers = {**normal_user_token_headers, "Idempotency-Key": "lunch-3"}
+    body = {"amount": 60, "description": "Pho", "group_id": group_id}
+
+    async def send_duplicates():
+        # One event loop for every request, like a real server
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(
+                *(
+                    async_client.post(f"{settings.API_V1_STR}/expenses/", headers=headers, json=body)
+                    for _ in range(5)
+                )
+            )
+
+    responses = asyncio.run(send_duplicates())
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len({response.content for response in responses}) == 1
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 4
+    assert _expense_count(session) == 1
@@ -1,5 +1,9 @@
 from fastapi.testclient import TestClient
 from core.config import settings
+from models.group_member import GroupMember
+from services.membership import membership_cache
+from sqlalchemy import insert
+from sqlmodel import Session
 
 def test_create_group(client: TestClient, normal_user_token_headers):
     response = client.post(
@@ -85,3 +89,119 @@ def test_join_nonexistent_group(client: TestClient, normal_user_token_headers):
         headers=normal_user_token_headers
     )
     assert join_resp.status_code == 404
+
+def test_membership_is_cached(client: TestClient, normal_user_token_headers):
+    group_resp = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Cached Group"}
+    )
+    group_id = group_resp.json()["id"]
+
+    membership_cache.clear()
+    for _ in range(3):
+        response = client.post(
+            f"{settings.API_V1_STR}/expenses/",
+            headers=normal_user_token_headers,
+            json={"amount": 10, "description": "Pho", "group_id": group_id}
+        )
+        assert response.status_code == 200
+
+    stats = membership_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+    health = client.get("/health").json()
+    assert health["caches"]["memberships"]["hits"] == 2
+
+def test_removed_member_is_invalidated(client: TestClient, session: Session, normal_user_token_headers):
+    group_resp = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Leaving Group"}
+    )
+    group_id = group_resp.json()["id"]
+    response = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+
+    # Remove the membership through the ORM: the cached list must be dropped
+    session.delete(session.get(GroupMember, (group_id, 1)))
+    session.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+
+def test_read_group_details(client: TestClient, normal_user_token_headers):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Detail Group", "description": "Noodles"}
+    ).json()["id"]
+
+    response = client.get(f"{settings.API_V1_STR}/groups/{group_id}", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["name"] == "Detail Group"
+    assert data["members"] == [{"user_id": 1, "role": "admin"}]
+
+    assert client.get(f"{settings.API_V1_STR}/groups/999", headers=normal_user_token_headers).status_code == 404
+
+
+def test_group_details_ignore_stale_member_cache(client: TestClient, session: Session, normal_user_token_headers):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Stale Group"}
+    ).json()["id"]
+    client.get(f"{settings.API_V1_STR}/groups/{group_id}", headers=normal_user_token_headers)
+    assert membership_cache.get(group_id) is not None
+
+    # Another worker handles a join: this worker's cache still has one member
+    session.exec(insert(GroupMember.__table__).values(group_id=group_id, user_id=2, role="member"))
+    session.commit()
+    assert membership_cache.get(group_id).member_ids == (1,)
+
+    data = client.get(f"{settings.API_V1_STR}/groups/{group_id}", headers=normal_user_token_headers).json()
+    assert [member["user_id"] for member in data["members"]] == [1, 2]
+
+
+def test_conditional_get_follows_group_writes(client: TestClient, normal_user_token_headers):
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "ETag Group"}
+    ).json()["id"]
+    urls = [
+        f"{settings.API_V1_STR}/groups/",
+        f"{settings.API_V1_STR}/groups/{group_id}",
+        f"{settings.API_V1_STR}/groups/{group_id}/settlements",
+        f"{settings.API_V1_STR}/me/balances",
+    ]
+    etags = {}
+    for url in urls:
+        response = client.get(url, headers=normal_user_token_headers)
+        assert response.headers["ETag"].startswith('W/"')
+        etags[url] = response.headers["ETag"]
+
+        response = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etags[url]})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etags[url]
+
+    # Any write to the group changes every ETag
+    client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 20, "description": "Banh mi", "group_id": group_id}
+    )
+    for url in urls:
+        response = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etags[url]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[url]
@@ -0,0 +1,97 @@
+import json
+
+from fastapi.testclient import TestClient
+from core.config import settings
+
+
+def test_import_csv(client: TestClient, create_group, normal_user_token_headers):
+    group_id = create_group(normal_user_token_headers, "Import Group")
+    body = "\n".join([
+        "amount,description,date",
+        "12.50,Pho,2025-01-02T12:00:00",
+        "abc,Broken amount,",
+        "",
+        "7,Tra da,2025-01-03",
+        "-1,Negative,",
+        "3.333,Too precise,",
+        "5,Bad date,yesterday",
+        "1e30,Too large,",
+    ])
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/import",
+        headers={**normal_user_token_headers, "Content-Type": "text/csv"},
+        content=body.encode()
+    )
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["imported"] == 2
+    assert result["failed"] == 5
+    assert [error["row"] for error in result["errors"]] == [3, 6, 7, 8, 9]
+    assert result["errors"][-1]["error"] == "amount is too large"
+
+    page = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers
+    ).json()
+    assert [item["description"] for item in page["items"]] == ["Tra da", "Pho"]
+
+
+def test_import_ndjson_updates_balances(client: TestClient, create_group, normal_user_token_headers):
+    group_id = create_group(normal_user_token_headers, "NDJSON Group")
+    client.post(
+        f"{settings.API_V1_STR}/auth/signup",
+        json={
+            "email": "friend@example.com",
+            "username": "friend",
+            "first_name": "Friend",
+            "last_name": "User",
+            "password": "password123"
+        }
+    )
+    resp = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "friend@example.com", "password": "password123"}
+    )
+    friend_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=friend_headers)
+
+    lines = [json.dumps({"amount": "20", "description": f"Lunch {i}"}) for i in range(3)]
+    lines.append(json.dumps({"amount": "10", "payer_id": 999}))
+    lines.append("{not json")
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/import",
+        headers=friend_headers,
+        params={"format": "ndjson"},
+        content="\n".join(lines).encode()
+    )
+    result = resp.json()
+    assert result["imported"] == 3
+    assert result["failed"] == 2
+
+    # friend paid 3 x 20 split in two: normal user owes 30
+    settlements = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/settlements",
+        headers=normal_user_token_headers
+    ).json()
+    assert [float(t["amount"]) for t in settlements["transfers"]] == [30.0]
+
+
+def test_import_rejects_bad_header(client: TestClient, create_group, normal_user_token_headers):
+    group_id = create_group(normal_user_token_headers, "Header Group")
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/import",
+        headers=normal_user_token_headers,
+        content=b"price,description\n10,Pho\n"
+    )
+    assert resp.status_code == 400
+
+
+def test_import_csv_with_byte_order_mark(client: TestClient, create_group, normal_user_token_headers):
+    group_id = create_group(normal_user_token_headers, "Excel Group")
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/import",
+        headers=normal_user_token_headers,
+        content="amount,description\n10,Pho\n".encode("utf-8-sig")
+    )
+    assert resp.status_code == 200
+    assert resp.json()["imported"] == 1
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from core.config import settings
+
+
+def test_read_my_balances(client: TestClient, normal_user_token_headers):
+    # Second user who pays for lunch in one of the groups
+    client.post(
+        f"{settings.API_V1_STR}/auth/signup",
+        json={
+            "email": "payer@example.com",
+            "username": "payer",
+            "first_name": "Payer",
+            "last_name": "User",
+            "password": "password123"
+        }
+    )
+    resp = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "payer@example.com", "password": "password123"}
+    )
+    payer_headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    group_ids = []
+    for name in ("Team A", "Team B"):
+        group_ids.append(client.post(
+            f"{settings.API_V1_STR}/groups/",
+            headers=payer_headers,
+            json={"name": name}
+        ).json()["id"])
+        client.post(
+            f"{settings.API_V1_STR}/groups/{group_ids[-1]}/join",
+            headers=normal_user_token_headers
+        )
+
+    for amount in (40, 20):
+        client.post(
+            f"{settings.API_V1_STR}/expenses/",
+            headers=payer_headers,
+            json={"amount": amount, "description": "Lunch", "group_id": group_ids[0]}
+        )
+
+    resp = client.get(f"{settings.API_V1_STR}/me/balances", headers=normal_user_token_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [(g["group_name"], float(g["net"])) for g in data["groups"]] == [
+        ("Team A", -30.0),
+        ("Team B", 0.0),
+    ]
+    assert float(data["total"]) == -30.0
+
+    resp = client.get(f"{settings.API_V1_STR}/me/balances", headers=payer_headers)
+    assert float(resp.json()["total"]) == 30.0
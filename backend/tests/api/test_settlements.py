@@ -0,0 +1,222 @@
+import time
+
+from fastapi.testclient import TestClient
+from core.config import settings
+from core.jobs import job_worker
+from models.expense_share import ExpenseShare
+from models.settlement import Settlement
+from services.ledger import reconcile_balances
+from services.settlement_plans import settlement_plans
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def test_group_settlements(client: TestClient, normal_user_token_headers, signup_and_login):
+    group_resp = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Settle Group"},
+    )
+    group_id = group_resp.json()["id"]
+
+    alice_headers = signup_and_login("alice")
+    bob_headers = signup_and_login("bob")
+    for headers in (alice_headers, bob_headers):
+        client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=headers)
+
+    # normal_user pays 90 (30 each), alice pays 30 (10 each)
+    client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 90, "description": "Pho", "group_id": group_id},
+    )
+    client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=alice_headers,
+        json={"amount": 30, "description": "Coffee", "group_id": group_id},
+    )
+
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/settlements",
+        headers=bob_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["group_id"] == group_id
+
+    # normal_user: +60 -10 = +50, alice: -30 +20 = -10, bob: -30 -10 = -40
+    nets = sorted(float(b["net"]) for b in data["balances"])
+    assert nets == [-40.0, -10.0, 50.0]
+
+    transfers = data["transfers"]
+    assert len(transfers) == 2
+    assert sum(float(t["amount"]) for t in transfers) == 50.0
+
+
+def test_group_settlements_not_member(
+    client: TestClient, normal_user_token_headers, signup_and_login
+):
+    group_resp = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Private Group"},
+    )
+    group_id = group_resp.json()["id"]
+
+    outsider_headers = signup_and_login("outsider")
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/settlements",
+        headers=outsider_headers,
+    )
+    assert resp.status_code == 403
+
+    resp = client.get(
+        f"{settings.API_V1_STR}/groups/999999/settlements",
+        headers=outsider_headers,
+    )
+    assert resp.status_code == 404
+
+
+def _group_where_bob_owes(
+    client: TestClient, normal_user_token_headers, signup_and_login, amounts
+):
+    """normal_user (id 1) pays each amount, split with bob (id 2)."""
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=normal_user_token_headers,
+        json={"name": "Settle Up Group"},
+    ).json()["id"]
+    bob_headers = signup_and_login("bob")
+    client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=bob_headers)
+    for amount in amounts:
+        client.post(
+            f"{settings.API_V1_STR}/expenses/",
+            headers=normal_user_token_headers,
+            json={"amount": amount, "description": "Lunch", "group_id": group_id},
+        )
+    return group_id, bob_headers
+
+
+def _nets(client: TestClient, headers, group_id: int) -> dict:
+    data = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/settlements", headers=headers
+    ).json()
+    return {b["user_id"]: float(b["net"]) for b in data["balances"]}
+
+
+def test_settle_all_open_shares(
+    client: TestClient, session: Session, normal_user_token_headers, signup_and_login
+):
+    group_id, bob_headers = _group_where_bob_owes(
+        client, normal_user_token_headers, signup_and_login, [20, 40, 60]
+    )
+    assert _nets(client, bob_headers, group_id) == {1: 60.0, 2: -60.0}
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=bob_headers,
+        json={"debtor_id": 2, "creditor_id": 1},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert float(data["amount"]) == 60.0
+    assert data["shares_settled"] == 3
+
+    assert _nets(client, bob_headers, group_id) == {}
+    assert session.exec(
+        select(ExpenseShare).where(ExpenseShare.user_id == 2, ExpenseShare.is_paid == False)  # noqa: E712
+    ).all() == []
+    assert session.get(Settlement, data["id"]).shares_settled == 3
+
+    # Ledger and shares still agree
+    assert reconcile_balances(session, apply=False) == []
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=bob_headers,
+        json={"debtor_id": 2, "creditor_id": 1},
+    )
+    assert resp.status_code == 400
+
+
+def test_settle_up_to_amount_takes_oldest_shares(
+    client: TestClient, normal_user_token_headers, signup_and_login
+):
+    # Bob owes 10, then 20, then 30
+    group_id, bob_headers = _group_where_bob_owes(
+        client, normal_user_token_headers, signup_and_login, [20, 40, 60]
+    )
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=normal_user_token_headers,
+        json={"debtor_id": 2, "creditor_id": 1, "amount": "35"},
+    )
+    assert resp.status_code == 200
+    # 10 + 20 fit in 35, the 30 share is left open
+    assert float(resp.json()["amount"]) == 30.0
+    assert resp.json()["shares_settled"] == 2
+    assert _nets(client, bob_headers, group_id) == {1: 30.0, 2: -30.0}
+
+    # Smaller than the oldest open share
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=normal_user_token_headers,
+        json={"debtor_id": 2, "creditor_id": 1, "amount": "5"},
+    )
+    assert resp.status_code == 400
+
+
+def test_settle_requires_a_party(client: TestClient, normal_user_token_headers, signup_and_login):
+    group_id, _ = _group_where_bob_owes(client, normal_user_token_headers, signup_and_login, [20])
+    carol_headers = signup_and_login("carol")
+    client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=carol_headers)
+
+    resp = client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=carol_headers,
+        json={"debtor_id": 2, "creditor_id": 1},
+    )
+    assert resp.status_code == 403
+
+
+def test_settlement_plan_is_precomputed_after_writes(
+    client: TestClient,
+    async_engine,
+    query_budget,
+    monkeypatch,
+    normal_user_token_headers,
+    signup_and_login,
+):
+    # The background job opens its own sessions: point them at the test database
+    monkeypatch.setattr(
+        "services.settlement_plans.async_session",
+        async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    group_id, bob_headers = _group_where_bob_owes(
+        client, normal_user_token_headers, signup_and_login, []
+    )
+    failed = job_worker.failed
+
+    # Entering the client runs the lifespan, which starts the worker
+    with client:
+        for amount in (20, 40):
+            client.post(
+                f"{settings.API_V1_STR}/expenses/",
+                headers=normal_user_token_headers,
+                json={"amount": amount, "description": "Lunch", "group_id": group_id},
+            )
+        deadline = time.monotonic() + 5
+        # Both writes done: the latest plan has both expenses
+        while getattr(settlement_plans.get(group_id), "balances", None) != {1: 3000, 2: -3000}:
+            assert time.monotonic() < deadline, "The settlement plan was never computed"
+            time.sleep(0.01)
+
+        # Only the group version is read: the plan is already there
+        with query_budget(1):
+            assert _nets(client, bob_headers, group_id) == {1: 30.0, 2: -30.0}
+
+    assert job_worker.failed == failed
+    # Stopped with the app: later writes compute their plan on demand
+    assert job_worker.stats()["depth"] == 0
@@ -2,12 +2,22 @@ from main import app
 from db.session import get_db
 from core.config import settings
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from typing import List, Tuple
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.metrics import instrument_engine
+from services.idempotency import idempotency_store
+from services.membership import membership_cache
+from services.settlement_plans import settlement_plans
+from services.user_cache import user_cache
 
 # Ensure the project root is importable when running pytest from the repository root
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,36 +27,85 @@ if str(ROOT) not in sys.path:
 
 # Import all models so SQLModel knows about them for metadata creation
 
-# Use SQLite in-memory database for testing
-# StaticPool is important for in-memory SQLite to share connection across threads/sessions
-TEST_DATABASE_URL = "sqlite://"
-
-engine = create_engine(
-    TEST_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
-)
+# Use a throwaway SQLite file per test: the API talks to it through aiosqlite,
+# while tests inspect it through a regular sync Session on the same file.
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path: Path) -> Path:
+    return tmp_path / "test.db"
 
 
 @pytest.fixture(name="session")
-def session_fixture():
+def session_fixture(db_path: Path):
+    engine = create_engine(f"sqlite:///{db_path}")
     # Create tables
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
-    # Drop tables after test
-    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(session: Session, db_path: Path):
+    # NullPool: aiosqlite connections are not shared across TestClient event loops
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    # Instrumented like the app's engine in db/session.py
+    instrument_engine(engine.sync_engine)
+    return engine
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
-    def get_session_override():
-        return session
+def client_fixture(async_engine):
+    async def get_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
 
     app.dependency_overrides[get_db] = get_session_override
+    # User and group ids restart at 1 in every test database
+    user_cache.clear()
+    membership_cache.clear()
+    idempotency_store.clear()
+    settlement_plans.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
 
 
+class QueryBudget:
+    """
+    Records every SQL statement the API sends to the test database.
+
+        with query_budget(4):
+            client.post(...)
+
+    fails if more than 4 statements were issued inside the block and lists
+    them. An executemany counts as one statement (one round trip).
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(" ".join(statement.split()))
+
+    @contextmanager
+    def __call__(self, max_statements: int):
+        start = len(self.statements)
+        yield self
+        issued = self.statements[start:]
+        assert len(issued) <= max_statements, (
+            f"{len(issued)} statements issued, budget is {max_statements}:\n"
+            + "\n".join(f"  {i}. {statement}" for i, statement in enumerate(issued, 1))
+        )
+
+
+@pytest.fixture(name="query_budget")
+def query_budget_fixture(async_engine):
+    budget = QueryBudget()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", budget.before_cursor_execute)
+    yield budget
+    event.remove(async_engine.sync_engine, "before_cursor_execute", budget.before_cursor_execute)
+
+
 @pytest.fixture(name="normal_user_token_headers")
 def normal_user_token_headers_fixture(client: TestClient):
     """
@@ -71,3 +130,68 @@ def normal_user_token_headers_fixture(client: TestClient):
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@pytest.fixture(name="signup_and_login")
+def signup_and_login_fixture(client: TestClient):
+    """
+    Returns a function creating another user from a name ("alice") and
+    returning their access token headers.
+    """
+
+    def signup_and_login(name: str) -> dict:
+        user_data = {
+            "email": f"{name}@example.com",
+            "username": name,
+            "first_name": name.capitalize(),
+            "last_name": "User",
+            "password": "password123",
+        }
+        client.post(f"{settings.API_V1_STR}/auth/signup", json=user_data)
+        response = client.post(
+            f"{settings.API_V1_STR}/auth/login/access-token",
+            data={"username": user_data["email"], "password": user_data["password"]},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return signup_and_login
+
+
+@pytest.fixture(name="create_group")
+def create_group_fixture(client: TestClient):
+    """
+    Returns a function creating a group as the user of `headers` and
+    returning its id.
+    """
+
+    def create_group(headers: dict, name: str = "Test Group") -> int:
+        response = client.post(f"{settings.API_V1_STR}/groups/", headers=headers, json={"name": name})
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    return create_group
+
+
+@pytest.fixture(name="seed_group")
+def seed_group_fixture(client: TestClient, create_group, signup_and_login, normal_user_token_headers):
+    """
+    Returns a function creating a group owned by the test user, which
+    `member` ("alice") joins, then importing `rows` ("amount,description,
+    date,payer_id" CSV lines, an empty date meaning now) as the owner.
+    The function returns the group id and the member's headers.
+    """
+
+    def seed_group(name: str, member: str, rows: List[str]) -> Tuple[int, dict]:
+        group_id = create_group(normal_user_token_headers, name)
+        member_headers = signup_and_login(member)
+        response = client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=member_headers)
+        assert response.status_code == 200
+        response = client.post(
+            f"{settings.API_V1_STR}/groups/{group_id}/import",
+            headers=normal_user_token_headers,
+            content="amount,description,date,payer_id\n" + "".join(f"{row}\n" for row in rows),
+        )
+        assert response.json()["imported"] == len(rows)
+        return group_id, member_headers
+
+    return seed_group
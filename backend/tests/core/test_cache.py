@@ -0,0 +1,58 @@
+from core.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    timer.now = 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+
+
+def test_replace_only_the_expected_entry():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=2, ttl=5, timer=timer)
+    old, new = ("old",), ("new",)
+    cache.set("a", old)
+    assert not cache.replace("a", ("other",), new)
+    assert not cache.replace("missing", old, new)
+
+    timer.now = 4
+    assert cache.replace("a", old, new)
+    assert cache.get("a") is new
+    # The expiry is kept
+    timer.now = 6
+    assert cache.get("a") is None
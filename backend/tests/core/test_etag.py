@@ -0,0 +1,25 @@
+from core.etag import etag_matches, weak_etag
+from starlette.requests import Request
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+def test_weak_etag_is_stable():
+    assert weak_etag("group", 1, 3) == weak_etag("group", 1, 3)
+    assert weak_etag("group", 1, 3) != weak_etag("group", 1, 4)
+    assert weak_etag("group", 1, 3).startswith('W/"')
+
+
+def test_etag_matches():
+    etag = weak_etag("group", 1, 3)
+    opaque = etag.removeprefix("W/")
+    assert not etag_matches(_request(), etag)
+    assert etag_matches(_request(etag), etag)
+    # Weak comparison: the W/ prefix is ignored
+    assert etag_matches(_request(opaque), etag)
+    assert etag_matches(_request(f'W/"other", {etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('W/"other"'), etag)
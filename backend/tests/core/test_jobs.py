@@ -0,0 +1,135 @@
+import asyncio
+
+from core.jobs import JobWorker
+
+
+def _worker(**options) -> JobWorker:
+    defaults = {"maxsize": 10, "concurrency": 1, "max_attempts": 3, "backoff": 0.001, "drain_timeout": 1}
+    return JobWorker(**{**defaults, **options})
+
+
+def test_jobs_for_a_waiting_key_coalesce():
+    async def scenario():
+        worker = _worker()
+        await worker.start()
+        ran = []
+
+        async def job(value):
+            ran.append(value)
+
+        # Nothing runs before the submitting coroutine yields
+        for value in range(5):
+            assert worker.submit(("group", 1), lambda value=value: job(value))
+        assert worker.submit(("group", 2), lambda: job("other"))
+        assert worker.depth == 2
+        await worker.stop()
+
+        # Only the latest job of each key ran
+        assert ran == [4, "other"]
+        assert worker.stats()["coalesced"] == 4
+        assert worker.stats()["succeeded"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_jobs_are_retried_with_backoff():
+    async def scenario():
+        worker = _worker(max_attempts=3)
+        await worker.start()
+        attempts = []
+
+        async def flaky():
+            attempts.append(asyncio.get_running_loop().time())
+            if len(attempts) < 3:
+                raise RuntimeError("database is locked")
+
+        async def broken():
+            raise RuntimeError("always")
+
+        worker.submit("flaky", flaky)
+        worker.submit("broken", broken)
+        await worker.stop()
+
+        assert len(attempts) == 3
+        # Exponential backoff: the second wait is longer than the first
+        assert attempts[2] - attempts[1] >= attempts[1] - attempts[0]
+        stats = worker.stats()
+        assert (stats["succeeded"], stats["failed"], stats["retried"]) == (1, 1, 4)
+
+    asyncio.run(scenario())
+
+
+def test_superseded_job_is_not_retried():
+    async def scenario():
+        worker = _worker(backoff=0.05)
+        await worker.start()
+        ran = []
+        done = asyncio.Event()
+
+        async def failing():
+            ran.append("old")
+            worker.submit("key", newer)
+            raise RuntimeError("stale")
+
+        async def newer():
+            ran.append("new")
+            done.set()
+
+        worker.submit("key", failing)
+        # Submitted before stop(): jobs submitted while draining are refused
+        await asyncio.wait_for(done.wait(), 1)
+        await worker.stop()
+        assert ran == ["old", "new"]
+
+    asyncio.run(scenario())
+
+
+def test_queue_is_bounded_and_closed_after_stop():
+    async def scenario():
+        worker = _worker(maxsize=2)
+
+        async def job():
+            pass
+
+        # Not started: jobs are refused, callers compute on demand
+        assert not worker.submit("a", job)
+        await worker.start()
+        assert worker.submit("a", job)
+        assert worker.submit("b", job)
+        assert not worker.submit("c", job)
+        # Coalescing needs no room
+        assert worker.submit("a", job)
+        await worker.stop()
+
+        assert not worker.submit("d", job)
+        assert worker.stats()["rejected"] == 2 + 1
+
+    asyncio.run(scenario())
+
+
+def test_stop_drains_queue_within_timeout():
+    async def scenario():
+        worker = _worker(concurrency=1, drain_timeout=0.05)
+        await worker.start()
+        finished = []
+
+        async def slow(name):
+            await asyncio.sleep(1 if name == "slow" else 0)
+            finished.append(name)
+
+        worker.submit("fast", lambda: slow("fast"))
+        worker.submit("slow", lambda: slow("slow"))
+        await worker.stop()
+
+        # The queue was drained up to the timeout, then the rest cancelled
+        assert finished == ["fast"]
+        assert worker.depth == 0 and worker.running == 0
+
+    asyncio.run(scenario())
+
+
+def test_render_metrics():
+    worker = _worker()
+    lines = worker.render_metrics()
+    assert "background_jobs_queued 0" in lines
+    assert 'background_jobs_total{outcome="failed"} 0' in lines
@@ -0,0 +1,44 @@
+from core.config import settings
+from core.metrics import Histogram, MetricsRegistry, RequestDbStats, metrics
+from fastapi.testclient import TestClient
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.render("latency", 'route="/x"') == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 3.65',
+        'latency_count{route="/x"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe_request("GET", '/a"b', 200, 0.01, RequestDbStats())
+    assert 'route="/a\\"b"' in registry.render()
+
+
+def test_metrics_endpoint_reports_routes_and_queries(client: TestClient, normal_user_token_headers):
+    metrics.reset()
+    client.get(f"{settings.API_V1_STR}/groups/", headers=normal_user_token_headers)
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+
+    route = 'method="GET",route="/api/v1/groups/"'
+    assert f'http_requests_total{{{route},status="200"}} 1' in body
+    assert f'http_request_duration_seconds_count{{{route}}} 1' in body
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in body
+    assert "http_requests_in_flight 1" in body  # the /metrics request itself
+
+    # Loading the (not yet cached) current user, then the groups query
+    assert f"db_queries_total{{{route}}} 2" in body
+    assert "db_query_duration_seconds_count" in body
@@ -0,0 +1,46 @@
+import asyncio
+
+from core.pubsub import Broker, InProcessBackend
+
+
+def test_fan_out_per_channel():
+    async def scenario():
+        broker = Broker(InProcessBackend(), queue_size=10)
+        with broker.subscribe("a") as first, broker.subscribe("a") as second, broker.subscribe("b") as other:
+            await broker.publish("a", b"hello")
+            assert first.queue.get_nowait() == b"hello"
+            assert second.queue.get_nowait() == b"hello"
+            assert other.queue.empty()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_dropped():
+    async def scenario():
+        broker = Broker(InProcessBackend(), queue_size=2)
+        with broker.subscribe("a") as slow:
+            for i in range(3):
+                await broker.publish("a", b"%d" % i)
+            assert slow.closed
+            assert broker.dropped == 1
+            # Nothing more is yielded once closed
+            assert [message async for message in slow.listen(1)] == []
+
+    asyncio.run(scenario())
+
+
+def test_listen_yields_keepalives_until_closed():
+    async def scenario():
+        broker = Broker(InProcessBackend(), queue_size=10)
+        with broker.subscribe("a") as subscription:
+            received = []
+            async for message in subscription.listen(0.01):
+                received.append(message)
+                if message is None:
+                    await broker.publish("a", b"event")
+                else:
+                    broker.close()
+            assert received == [None, b"event"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from core.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from schemas.expense import ExpensePage
+
+
+def _page(date: datetime) -> dict:
+    return {
+        "items": [
+            {
+                "amount": Decimal("12.50"),
+                "description": "Com tam",
+                "group_id": 1,
+                "id": 7,
+                "date": date,
+                "payer_id": 1,
+                "shares": [
+                    {"user_id": 1, "amount": Decimal("6.25"), "is_paid": True},
+                    {"user_id": 2, "amount": Decimal("6.25"), "is_paid": False},
+                ],
+            }
+        ],
+        "next_cursor": None,
+    }
+
+
+def test_orjson_response_matches_pydantic_output():
+    adapter = TypeAdapter(ExpensePage)
+    for date in (
+        datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        datetime(2024, 5, 1, 12, 30),  # naive, as read back from SQLite
+    ):
+        page = _page(date)
+        expected = adapter.dump_json(adapter.validate_python(page))
+        assert ORJSONResponse(page).body == expected
+
+
+def test_hot_endpoints_keep_their_documented_schema(client):
+    schema = client.get("/api/v1/openapi.json").json()
+    operation = schema["paths"]["/api/v1/groups/{group_id}/expenses"]["get"]
+    content = operation["responses"]["200"]["content"]["application/json"]
+    assert content["schema"]["$ref"].endswith("/ExpensePage")
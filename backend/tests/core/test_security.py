@@ -1,3 +1,6 @@
+import asyncio
+
+import pytest
 from core import security
 
 def test_password_hashing():
@@ -10,3 +13,26 @@ def test_access_token_creation():
     token = security.create_access_token(subject=123)
     assert isinstance(token, str)
     assert len(token) > 0
+
+def test_verify_and_update_rehashes_other_cost():
+    old_hash = security.build_crypt_context(4).hash("secret_password")
+    verified, new_hash = security.verify_and_update_password("secret_password", old_hash)
+    assert verified
+    assert new_hash is not None
+    assert security.pwd_context.needs_update(new_hash) is False
+
+    current_hash = security.get_password_hash("secret_password")
+    assert security.verify_and_update_password("secret_password", current_hash) == (True, None)
+
+def test_password_hasher_pool():
+    hasher = security.PasswordHasher(workers=1, max_pending=1)
+    try:
+        hashed = asyncio.run(hasher.hash("secret_password"))
+        assert asyncio.run(hasher.verify_and_update("secret_password", hashed)) == (True, None)
+    finally:
+        hasher.shutdown()
+
+def test_password_hasher_rejects_when_saturated():
+    hasher = security.PasswordHasher(workers=1, max_pending=0)
+    with pytest.raises(security.PasswordHasherBusy):
+        asyncio.run(hasher.hash("secret_password"))
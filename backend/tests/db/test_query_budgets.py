@@ -0,0 +1,278 @@
+"""
+Query budgets: every API route must issue a bounded number of SQL statements,
+independent of how many members, expenses or groups are involved. Catches
+N+1 queries before they reach production; a failure lists the statements.
+
+Budgets are for warm caches (current user and group members already cached),
+the steady state of a busy server, unless a test says otherwise. Every write
+to a group also bumps its version (one UPDATE), which conditional GETs use to
+answer 304 from a single lookup.
+"""
+import pytest
+from core.config import settings
+from fastapi.testclient import TestClient
+from models.group_member import GroupMember
+from models.user import User
+from sqlmodel import Session, select
+
+API = settings.API_V1_STR
+
+
+def _add_members(session: Session, group_id: int, count: int) -> None:
+    for i in range(count):
+        user = User(
+            email=f"member{group_id}-{i}@example.com",
+            username=f"member{group_id}-{i}",
+            first_name="Member",
+            last_name=str(i),
+            hashed_password="x",
+        )
+        session.add(user)
+        session.flush()
+        session.add(GroupMember(group_id=group_id, user_id=user.id))
+    session.commit()
+
+
+def _create_expense(client: TestClient, headers, group_id: int) -> None:
+    response = client.post(
+        f"{API}/expenses/",
+        headers=headers,
+        json={"amount": 30, "description": "Bun bo", "group_id": group_id},
+    )
+    assert response.status_code == 200
+
+
+def _warm(client: TestClient, headers, group_id: int) -> None:
+    # Caches the current user and the group's members
+    client.get(f"{API}/groups/{group_id}/settlements", headers=headers)
+
+
+def test_auth_routes(client: TestClient, query_budget, normal_user_token_headers):
+    # Email and username uniqueness checks, insert, refresh
+    with query_budget(4):
+        response = client.post(
+            f"{API}/auth/signup",
+            json={
+                "email": "budget@example.com",
+                "username": "budget",
+                "first_name": "Budget",
+                "last_name": "User",
+                "password": "password123",
+            },
+        )
+    assert response.status_code == 200
+    with query_budget(1):
+        response = client.post(
+            f"{API}/auth/login/access-token",
+            data={"username": "budget@example.com", "password": "password123"},
+        )
+    assert response.status_code == 200
+
+    client.get(f"{API}/auth/me", headers=normal_user_token_headers)
+    with query_budget(0):
+        response = client.get(f"{API}/auth/me", headers=normal_user_token_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("extra_members", [1, 10])
+def test_create_expense_regardless_of_member_count(
+    client: TestClient,
+    create_group,
+    session: Session,
+    query_budget,
+    normal_user_token_headers,
+    extra_members,
+):
+    group_id = create_group(normal_user_token_headers)
+    _add_members(session, group_id, extra_members)
+
+    # Cold membership cache: version check, member list, expense, shares,
+    # ledger upsert, monthly rollup upsert, version bump
+    with query_budget(7):
+        _create_expense(client, normal_user_token_headers, group_id)
+    # The cached members are still at the group's version
+    with query_budget(6):
+        _create_expense(client, normal_user_token_headers, group_id)
+
+
+def test_group_routes(
+    client: TestClient, create_group, session: Session, query_budget, normal_user_token_headers
+):
+    client.get(f"{API}/auth/me", headers=normal_user_token_headers)
+    # Group insert, creator membership insert, refresh
+    with query_budget(3):
+        group_id = create_group(normal_user_token_headers)
+    create_group(normal_user_token_headers, "Second Group")
+    _add_members(session, group_id, 5)
+    for _ in range(3):
+        _create_expense(client, normal_user_token_headers, group_id)
+    _warm(client, normal_user_token_headers, group_id)
+
+    with query_budget(1):
+        response = client.get(f"{API}/groups/", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    # Not modified: same query, no body
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/",
+            headers={**normal_user_token_headers, "If-None-Match": response.headers["ETag"]},
+        )
+    assert response.status_code == 304
+
+    # Version, group with members; only the version when not modified
+    with query_budget(2):
+        response = client.get(f"{API}/groups/{group_id}", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert len(response.json()["members"]) == 6
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/{group_id}",
+            headers={**normal_user_token_headers, "If-None-Match": response.headers["ETag"]},
+        )
+    assert response.status_code == 304
+
+    # Version, balances; only the version when not modified
+    with query_budget(2):
+        response = client.get(
+            f"{API}/groups/{group_id}/settlements", headers=normal_user_token_headers
+        )
+    assert response.status_code == 200
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/{group_id}/settlements",
+            headers={**normal_user_token_headers, "If-None-Match": response.headers["ETag"]},
+        )
+    assert response.status_code == 304
+
+    # Expenses page + all their shares
+    with query_budget(2):
+        response = client.get(
+            f"{API}/groups/{group_id}/expenses", headers=normal_user_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+
+    # Archived history is merged into the same two statements
+    with query_budget(2):
+        response = client.get(
+            f"{API}/groups/{group_id}/expenses",
+            headers=normal_user_token_headers,
+            params={"include_archived": True},
+        )
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/{group_id}/export",
+            headers=normal_user_token_headers,
+            params={"format": "ndjson"},
+        )
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3 * 6
+
+    # Already a member: answered from the membership cache
+    with query_budget(1):
+        response = client.post(f"{API}/groups/{group_id}/join", headers=normal_user_token_headers)
+    assert response.status_code == 400
+
+    # Read from the monthly rollup only
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/{group_id}/analytics/monthly", headers=normal_user_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()["months"]) == 1
+    with query_budget(1):
+        response = client.get(
+            f"{API}/groups/{group_id}/analytics/top-payers", headers=normal_user_token_headers
+        )
+    assert response.status_code == 200
+
+    # Versions of the user's groups, balances; only the versions when not modified
+    with query_budget(2):
+        response = client.get(f"{API}/me/balances", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    with query_budget(1):
+        response = client.get(
+            f"{API}/me/balances",
+            headers={**normal_user_token_headers, "If-None-Match": response.headers["ETag"]},
+        )
+    assert response.status_code == 304
+
+    # Set-based share update, ledger upsert, version, settlement insert
+    # (+1 lock on Postgres)
+    debtor_id = session.exec(select(GroupMember.user_id).where(GroupMember.user_id != 1)).first()
+    with query_budget(4):
+        response = client.post(
+            f"{API}/groups/{group_id}/settle",
+            headers=normal_user_token_headers,
+            json={"debtor_id": debtor_id, "creditor_id": 1},
+        )
+    assert response.status_code == 200
+    assert response.json()["shares_settled"] == 3
+
+
+def test_import_route_per_chunk(client: TestClient, create_group, query_budget, normal_user_token_headers):
+    group_id = create_group(normal_user_token_headers)
+    _warm(client, normal_user_token_headers, group_id)
+    body = "amount,description\n" + "".join(f"{i + 1},Lunch {i}\n" for i in range(500))
+
+    # Members' version check, then one chunk: expenses, shares, ledger upsert,
+    # rollup upsert, version
+    with query_budget(6):
+        response = client.post(
+            f"{API}/groups/{group_id}/import",
+            headers=normal_user_token_headers,
+            content=body,
+        )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 500
+
+
+def test_join_routes(client: TestClient, create_group, query_budget, normal_user_token_headers):
+    owner = client.post(
+        f"{API}/auth/signup",
+        json={
+            "email": "owner@example.com",
+            "username": "owner",
+            "first_name": "Owner",
+            "last_name": "User",
+            "password": "password123",
+        },
+    )
+    assert owner.status_code == 200
+    token = client.post(
+        f"{API}/auth/login/access-token",
+        data={"username": "owner@example.com", "password": "password123"},
+    ).json()["access_token"]
+    owner_headers = {"Authorization": f"Bearer {token}"}
+    first = create_group(owner_headers, "First")
+    second = create_group(owner_headers, "Second")
+    client.get(f"{API}/auth/me", headers=normal_user_token_headers)
+
+    # Group lookup, member list, membership insert, version
+    with query_budget(4):
+        response = client.post(f"{API}/groups/{first}/join", headers=normal_user_token_headers)
+    assert response.status_code == 200
+
+    with query_budget(1):
+        response = client.post(f"{API}/groups/{second}/invite", headers=owner_headers)
+    assert response.status_code == 200
+    token = response.json()["invite_url"].split("token=")[1]
+
+    # Member list, membership insert, version
+    with query_budget(3):
+        response = client.post(
+            f"{API}/groups/join-by-token",
+            headers=normal_user_token_headers,
+            json={"token": token},
+        )
+    assert response.status_code == 200
+
+
+def test_static_routes(client: TestClient, query_budget):
+    with query_budget(0):
+        responses = [client.get(f"{API}/ping"), client.get("/health"), client.get("/metrics")]
+    assert [response.status_code for response in responses] == [200, 200, 200]
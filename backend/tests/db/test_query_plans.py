@@ -0,0 +1,171 @@
+"""
+Query-plan regression tests: drive the hot API routes, capture every SELECT
+they send to SQLite and fail if EXPLAIN QUERY PLAN shows a full table scan.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from core.config import settings
+from sqlalchemy import event
+from sqlmodel import Session
+
+
+@pytest.fixture(name="captured_selects")
+def captured_selects_fixture(async_engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(session: Session, statement: str, parameters) -> list:
+    """Return the EXPLAIN QUERY PLAN lines that scan a whole table."""
+    rows = session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+    ).all()
+    # detail looks like "SEARCH expense USING INDEX ..." or "SCAN expense"
+    return [
+        row[-1]
+        for row in rows
+        if row[-1].startswith("SCAN") and "CONSTANT ROW" not in row[-1]
+    ]
+
+
+def assert_no_full_scans(session: Session, captured) -> None:
+    assert captured, "No statement was captured"
+    offenders = []
+    for statement, parameters in captured:
+        scans = full_scans(session, statement, parameters)
+        if scans:
+            offenders.append(f"{scans} <- {statement}")
+    assert not offenders, "Full table scans:\n" + "\n".join(offenders)
+
+
+def _seed_group_with_expense(client: TestClient, headers) -> int:
+    group_id = client.post(
+        f"{settings.API_V1_STR}/groups/",
+        headers=headers,
+        json={"name": "Plan Group"}
+    ).json()["id"]
+    client.post(
+        f"{settings.API_V1_STR}/expenses/",
+        headers=headers,
+        json={"amount": 42, "description": "Banh mi", "group_id": group_id}
+    )
+    return group_id
+
+
+def test_auth_queries_use_indexes(client: TestClient, session: Session, captured_selects):
+    client.post(
+        f"{settings.API_V1_STR}/auth/signup",
+        json={
+            "email": "plan@example.com",
+            "username": "planuser",
+            "first_name": "Plan",
+            "last_name": "User",
+            "password": "password123"
+        }
+    )
+    resp = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": "plan@example.com", "password": "password123"}
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    client.get(f"{settings.API_V1_STR}/auth/me", headers=headers)
+
+    assert_no_full_scans(session, captured_selects)
+
+
+def test_group_queries_use_indexes(client: TestClient, session: Session, normal_user_token_headers, captured_selects):
+    group_id = _seed_group_with_expense(client, normal_user_token_headers)
+    captured_selects.clear()
+
+    client.get(f"{settings.API_V1_STR}/groups/", headers=normal_user_token_headers)
+    client.post(f"{settings.API_V1_STR}/groups/{group_id}/join", headers=normal_user_token_headers)
+    client.get(f"{settings.API_V1_STR}/groups/{group_id}/settlements", headers=normal_user_token_headers)
+    client.get(f"{settings.API_V1_STR}/me/balances", headers=normal_user_token_headers)
+    client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/analytics/monthly",
+        headers=normal_user_token_headers,
+        params={"start": "2025-01"}
+    )
+    client.get(f"{settings.API_V1_STR}/groups/{group_id}/analytics/top-payers", headers=normal_user_token_headers)
+
+    assert_no_full_scans(session, captured_selects)
+
+
+def test_settle_update_uses_indexes(client: TestClient, session: Session, normal_user_token_headers, async_engine):
+    group_id = _seed_group_with_expense(client, normal_user_token_headers)
+    updates = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    client.post(
+        f"{settings.API_V1_STR}/groups/{group_id}/settle",
+        headers=normal_user_token_headers,
+        json={"debtor_id": 2, "creditor_id": 1}
+    )
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    assert len(updates) == 1
+    statement, parameters = updates[0]
+    # The running-total window is computed over the pair's open shares only:
+    # scanning that materialized subquery is expected, scanning a table is not
+    scans = [
+        scan
+        for scan in full_scans(session, statement, parameters)
+        if "subquery" not in scan and scan != "SCAN anon_1"
+    ]
+    assert not scans, f"Full table scans: {scans} <- {statement}"
+
+
+def test_expense_queries_use_indexes(client: TestClient, session: Session, normal_user_token_headers, captured_selects):
+    group_id = _seed_group_with_expense(client, normal_user_token_headers)
+
+    page = client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers,
+        params={"limit": 1, "payer_id": 1}
+    ).json()
+    assert page["items"]
+    client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/export",
+        headers=normal_user_token_headers
+    )
+
+    assert_no_full_scans(session, captured_selects)
+
+
+def test_archived_history_uses_indexes(client: TestClient, session: Session, normal_user_token_headers, captured_selects):
+    group_id = _seed_group_with_expense(client, normal_user_token_headers)
+
+    params = {"limit": 1, "payer_id": 1, "include_archived": True}
+    client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/expenses",
+        headers=normal_user_token_headers,
+        params=params,
+    )
+    client.get(
+        f"{settings.API_V1_STR}/groups/{group_id}/export",
+        headers=normal_user_token_headers,
+        params={"include_archived": True},
+    )
+
+    # Each table is searched through its own index; only the merged
+    # (already limited) pages are scanned
+    history = [(s, p) for s, p in captured_selects if "archivedexpense" in s]
+    assert len(history) == 3
+    for statement, parameters in history:
+        scans = [
+            scan
+            for scan in full_scans(session, statement, parameters)
+            if "subquery" not in scan and not scan.startswith("SCAN anon_")
+        ]
+        assert not scans, f"Full table scans: {scans} <- {statement}"
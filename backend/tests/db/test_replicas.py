@@ -0,0 +1,123 @@
+"""
+Read-replica routing, with a second SQLite file standing in for the replica:
+it only sees the primary's data when the test copies it over (replicate()).
+"""
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from core.config import settings
+from db.session import ReplicaRouter
+from services.membership import membership_cache
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+API = settings.API_V1_STR
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="replica_path")
+def replica_path_fixture(tmp_path: Path) -> Path:
+    return tmp_path / "replica.db"
+
+
+@pytest.fixture(name="timer")
+def timer_fixture() -> FakeTimer:
+    return FakeTimer()
+
+
+@pytest.fixture(name="router")
+def router_fixture(monkeypatch, client: TestClient, replica_path: Path, timer: FakeTimer):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{replica_path}", poolclass=NullPool)
+    router = ReplicaRouter([engine], stickiness=5, timer=timer)
+    monkeypatch.setattr("db.session.replica_router", router)
+    monkeypatch.setattr("api.deps.replica_router", router)
+    return router
+
+
+def replicate(db_path: Path, replica_path: Path) -> None:
+    """Bring the replica up to date with the primary."""
+    with sqlite3.connect(db_path) as primary, sqlite3.connect(replica_path) as replica:
+        primary.backup(replica)
+
+
+def _group_names(client: TestClient, headers) -> list:
+    return [group["name"] for group in client.get(f"{API}/groups/", headers=headers).json()]
+
+
+def test_reads_go_to_the_replica_except_right_after_a_write(
+    router, client: TestClient, db_path: Path, replica_path: Path, timer, normal_user_token_headers
+):
+    client.post(f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Replicated"})
+    replicate(db_path, replica_path)
+    # Not replicated yet
+    client.post(f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Lagging"})
+
+    # Read-your-writes: the user just wrote, so they read from the primary
+    assert _group_names(client, normal_user_token_headers) == ["Replicated", "Lagging"]
+
+    timer.now += 6
+    assert _group_names(client, normal_user_token_headers) == ["Replicated"]
+
+    # Replica reads are not cached: they might be stale
+    membership_cache.clear()
+    response = client.get(f"{API}/groups/1/settlements", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert membership_cache.get(1) is None
+
+    # Writes always go to the primary
+    response = client.post(
+        f"{API}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 30, "description": "Pho", "group_id": 2},
+    )
+    assert response.status_code == 200
+    assert _group_names(client, normal_user_token_headers) == ["Replicated", "Lagging"]
+
+
+def test_round_robin_between_replicas(timer):
+    first, second = object(), object()
+    router = ReplicaRouter([], stickiness=5, timer=timer)
+    assert router.replica_for(1) is None
+
+    router.replicas = [first, second]
+    assert [router.replica_for(1) for _ in range(4)] == [first, second, first, second]
+
+    router.record_write(1)
+    assert router.replica_for(1) is None
+    assert router.replica_for(2) is not None
+    timer.now += 6
+    assert router.replica_for(1) is not None
+
+
+def test_lagging_replica_falls_back_to_primary(
+    router, client: TestClient, db_path: Path, replica_path: Path, timer, normal_user_token_headers
+):
+    # The replica has the schema but has not received the group yet
+    replicate(db_path, replica_path)
+    group_id = client.post(
+        f"{API}/groups/", headers=normal_user_token_headers, json={"name": "Unreplicated"}
+    ).json()["id"]
+    # Fills the membership cache from the primary
+    client.post(
+        f"{API}/expenses/",
+        headers=normal_user_token_headers,
+        json={"amount": 30, "description": "Pho", "group_id": group_id},
+    )
+    timer.now += 6
+
+    response = client.get(f"{API}/groups/{group_id}", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["members"] == [{"user_id": 1, "role": "admin"}]
+
+    response = client.get(f"{API}/groups/{group_id}/settlements", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["group_id"] == group_id
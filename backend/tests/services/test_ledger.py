@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from models.expense_share import ExpenseShare
+from models.expenses import Expense
+from models.group import Group
+from models.group_balance import GroupBalance
+from models.group_member import GroupMember
+from models.user import User
+from services.ledger import apply_balance_deltas, read_group_balances, reconcile_balances
+from sqlmodel import Session
+
+
+def _seed_group(session: Session) -> int:
+    for i in (1, 2, 3):
+        session.add(
+            User(
+                id=i,
+                email=f"u{i}@example.com",
+                username=f"u{i}",
+                first_name="U",
+                last_name=str(i),
+                hashed_password="x",
+            )
+        )
+    session.add(Group(id=1, name="Ledger Group"))
+    for i in (1, 2, 3):
+        session.add(GroupMember(group_id=1, user_id=i))
+    session.add(
+        Expense(id=1, amount=Decimal("30"), description="Bun cha", group_id=1, payer_id=1)
+    )
+    for i in (1, 2, 3):
+        session.add(
+            ExpenseShare(expense_id=1, user_id=i, amount=Decimal("10"), is_paid=i == 1)
+        )
+    session.commit()
+    return 1
+
+
+def test_apply_balance_deltas_accumulates(session: Session):
+    group_id = _seed_group(session)
+    apply_balance_deltas(session, group_id, {1: 2000, 2: -1000, 3: -1000})
+    apply_balance_deltas(session, group_id, {1: -500, 2: 500})
+    session.commit()
+
+    assert read_group_balances(session, group_id) == {1: 1500, 2: -500, 3: -1000}
+
+
+def test_reconcile_reports_and_fixes_drift(session: Session):
+    group_id = _seed_group(session)
+    session.add(GroupBalance(group_id=group_id, user_id=1, net_cents=999))
+    session.commit()
+
+    drift = reconcile_balances(session, apply=False)
+    assert (group_id, 1, 999, 2000) in drift
+    assert (group_id, 2, 0, -1000) in drift
+
+    reconcile_balances(session)
+    assert reconcile_balances(session, apply=False) == []
+    assert read_group_balances(session, group_id) == {1: 2000, 2: -1000, 3: -1000}
@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+from services.settlement import from_cents, simplify_debts, to_cents
+
+
+def test_cents_conversion():
+    assert to_cents(Decimal("12.34")) == 1234
+    assert to_cents(33.335) == 3334
+    assert from_cents(-1050) == Decimal("-10.50")
+
+
+def test_simplify_debts_settles_everyone():
+    balances = {1: 3000, 2: -1000, 3: -1500, 4: -500}
+    transfers = simplify_debts(balances)
+
+    # At most n - 1 transfers, and every balance ends at zero
+    assert len(transfers) <= len(balances) - 1
+    remaining = dict(balances)
+    for debtor_id, creditor_id, cents in transfers:
+        assert cents > 0
+        remaining[debtor_id] += cents
+        remaining[creditor_id] -= cents
+    assert all(cents == 0 for cents in remaining.values())
+
+
+def test_simplify_debts_no_balances():
+    assert simplify_debts({}) == []
+    assert simplify_debts({1: 0, 2: 0}) == []